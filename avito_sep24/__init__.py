@@ -1,6 +1,3 @@
-from .misc import app
-from .routes import root_router
+from .misc import create_app
 
-__all__ = ["app"]
-
-app.include_router(root_router)
+__all__ = ["create_app"]
@@ -0,0 +1,191 @@
+"""
+Creates the database schema and triggers. Run once before starting the app:
+
+    python -m avito_sep24.bootstrap
+"""
+
+from sqlalchemy import text
+
+import avito_sep24.models  # noqa: F401 (registers tables in the metadata)
+from avito_sep24.cache import NOTIFY_CHANNEL
+from avito_sep24.database import RawBase, get_engine
+from avito_sep24.models.change import CHANGE_SEQUENCE
+from avito_sep24.models.search import search_document
+
+# Migrations of databases created by previous versions of the app.
+# Every statement must be idempotent, they all run on each bootstrap.
+MIGRATIONS = [
+    # versions used to be marked with an "actual" flag instead of a pointer
+    *(
+        f"""
+        DO $$
+        BEGIN
+            IF EXISTS (
+                SELECT FROM information_schema.columns
+                WHERE table_schema = current_schema()
+                    AND table_name = '{entity}_version'
+                    AND column_name = 'actual'
+            ) THEN
+                ALTER TABLE {entity} ADD COLUMN current_version_id UUID;
+                UPDATE {entity} SET current_version_id = {entity}_version.id
+                    FROM {entity}_version
+                    WHERE {entity}_version.{entity}_id = {entity}.id
+                        AND {entity}_version.actual;
+                ALTER TABLE {entity} ALTER COLUMN current_version_id SET NOT NULL;
+                ALTER TABLE {entity} ADD CONSTRAINT fk_{entity}_current_version
+                    FOREIGN KEY (current_version_id) REFERENCES {entity}_version (id)
+                    DEFERRABLE INITIALLY DEFERRED;
+                ALTER TABLE {entity}_version DROP COLUMN actual;
+            END IF;
+        END $$
+        """
+        for entity in ("tender", "bid")
+    ),
+    # replaced by indexes that also cover the (created_at, id) pagination order
+    "DROP INDEX IF EXISTS ix_bid_tender_id_status",
+    "DROP INDEX IF EXISTS ix_bid_author",
+    # the approval counter of BidRepository.submit_decision
+    "ALTER TABLE bid ADD COLUMN IF NOT EXISTS approvals INTEGER NOT NULL DEFAULT 0",
+    # the full-text search documents, see TenderVersion
+    *(
+        f"""
+        ALTER TABLE {entity}_version ADD COLUMN IF NOT EXISTS search_vector tsvector
+            GENERATED ALWAYS AS ({search_document()}) STORED
+        """
+        for entity in ("tender", "bid")
+    ),
+    # the change feed, see ChangeTracked; rows that existed before it are
+    # numbered once, in no particular order, and precede all later changes
+    *(
+        statement
+        for entity in ("tender", "bid")
+        for statement in (
+            f"""
+            ALTER TABLE {entity}
+                ADD COLUMN IF NOT EXISTS change_xid BIGINT NOT NULL DEFAULT 0,
+                ADD COLUMN IF NOT EXISTS change_seq BIGINT NOT NULL DEFAULT 0
+            """,
+            f"""
+            UPDATE {entity} SET change_seq = nextval('{CHANGE_SEQUENCE.name}')
+                WHERE change_seq = 0
+            """,
+        )
+    ),
+]
+
+# Publish changed cache keys to the app instances (see avito_sep24.cache):
+# "employee:<username>", "responsible:<organization id>:<employee id>",
+# or just the kind on TRUNCATE, which clears the whole cache.
+CACHE_TRIGGERS = [
+    f"""
+    CREATE OR REPLACE FUNCTION notify_employee_changed() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'TRUNCATE' THEN
+            PERFORM pg_notify('{NOTIFY_CHANNEL}', 'employee');
+            RETURN NULL;
+        END IF;
+        IF TG_OP <> 'INSERT' THEN
+            PERFORM pg_notify('{NOTIFY_CHANNEL}', 'employee:' || OLD.username);
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            PERFORM pg_notify('{NOTIFY_CHANNEL}', 'employee:' || NEW.username);
+        END IF;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION notify_responsible_changed() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'TRUNCATE' THEN
+            PERFORM pg_notify('{NOTIFY_CHANNEL}', 'responsible');
+            RETURN NULL;
+        END IF;
+        IF TG_OP <> 'INSERT' THEN
+            PERFORM pg_notify(
+                '{NOTIFY_CHANNEL}',
+                'responsible:' || OLD.organization_id || ':' || OLD.user_id
+            );
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            PERFORM pg_notify(
+                '{NOTIFY_CHANNEL}',
+                'responsible:' || NEW.organization_id || ':' || NEW.user_id
+            );
+        END IF;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql
+    """,
+    *(
+        statement
+        for table, function in (
+            ("employee", "notify_employee_changed"),
+            ("organization_responsible", "notify_responsible_changed"),
+        )
+        for statement in (
+            f"DROP TRIGGER IF EXISTS {table}_cache_rows ON {table}",
+            f"""
+            CREATE TRIGGER {table}_cache_rows
+                AFTER INSERT OR UPDATE OR DELETE ON {table}
+                FOR EACH ROW EXECUTE FUNCTION {function}()
+            """,
+            f"DROP TRIGGER IF EXISTS {table}_cache_truncate ON {table}",
+            f"""
+            CREATE TRIGGER {table}_cache_truncate
+                AFTER TRUNCATE ON {table}
+                FOR EACH STATEMENT EXECUTE FUNCTION {function}()
+            """,
+        )
+    ),
+]
+
+
+# Stamp tenders and bids with their position in the change feed (see
+# avito_sep24.repositories.change) when they are created, get a new version or
+# change their status.
+CHANGE_TRIGGERS = [
+    f"""
+    CREATE OR REPLACE FUNCTION record_change() RETURNS trigger AS $$
+    BEGIN
+        NEW.change_xid := pg_current_xact_id()::text::bigint;
+        NEW.change_seq := nextval('{CHANGE_SEQUENCE.name}');
+        RETURN NEW;
+    END $$ LANGUAGE plpgsql
+    """,
+    *(
+        statement
+        for table in ("tender", "bid")
+        for statement in (
+            f"DROP TRIGGER IF EXISTS {table}_change ON {table}",
+            f"""
+            CREATE TRIGGER {table}_change
+                BEFORE INSERT OR UPDATE OF status, current_version_id ON {table}
+                FOR EACH ROW EXECUTE FUNCTION record_change()
+            """,
+        )
+    ),
+]
+
+
+def main() -> None:
+    with get_engine().begin() as conn:
+        RawBase.metadata.create_all(conn)
+
+        for migration in MIGRATIONS:
+            conn.execute(text(migration))
+        # the migrations may update the same rows twice, which queues checks of
+        # the deferred current version constraints; CREATE INDEX refuses to run
+        # on a table with pending checks, so they are run right away
+        conn.execute(text("SET CONSTRAINTS ALL IMMEDIATE"))
+
+        for statement in (*CACHE_TRIGGERS, *CHANGE_TRIGGERS):
+            conn.execute(text(statement))
+
+        # create_all skips existing tables together with their indexes,
+        # so indexes added to the models later are created separately
+        for table in RawBase.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+
+if __name__ == "__main__":
+    main()
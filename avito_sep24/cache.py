@@ -0,0 +1,412 @@
+import asyncio
+import datetime
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Collection, Hashable
+from dataclasses import dataclass
+from typing import Generic, Protocol, TypeVar
+from uuid import UUID
+
+import psycopg2
+from psycopg2.extensions import connection
+from sqlalchemy import and_, delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from starlette.concurrency import run_in_threadpool
+
+from avito_sep24.database import DbSession, execute_on_primary, get_engine
+from avito_sep24.env import (
+    IDENTITY_CACHE_SIZE,
+    IDENTITY_CACHE_TTL,
+    MEMBERSHIP_INDEX,
+    TENDER_FEED_CACHE,
+    TENDER_FEED_CACHE_MAX_STALENESS,
+    TENDER_FEED_CACHE_SIZE,
+)
+from avito_sep24.events import tender_events
+from avito_sep24.membership import MembershipIndex, fetch_existing, fetch_memberships
+from avito_sep24.models.tender_feed import TenderFeedGeneration, TenderFeedPage
+from avito_sep24.schemas.tender import TenderServiceType
+
+__all__ = [
+    "NOTIFY_CHANNEL",
+    "TTLCache",
+    "employee_ids",
+    "responsibles",
+    "memberships",
+    "CachedPage",
+    "TenderFeedCache",
+    "MemoryTenderFeedCache",
+    "PostgresTenderFeedCache",
+    "tender_feed",
+    "listen_for_invalidations",
+]
+
+logger = logging.getLogger(__name__)
+
+KeyT = TypeVar("KeyT", bound=Hashable)
+ValueT = TypeVar("ValueT")
+
+# triggers on employee and organization_responsible publish changed keys here,
+# see bootstrap.CACHE_TRIGGERS; tender events go through it as well
+NOTIFY_CHANNEL = "avito_sep24_cache"
+
+
+class TTLCache(Generic[KeyT, ValueT]):
+    """
+    LRU cache with expiring entries. Only used from the event loop thread:
+    repositories are async and the NOTIFY listener is driven by the loop too.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[KeyT, tuple[float, ValueT]] = OrderedDict()
+        # bumped by every invalidation, so a value loaded before an invalidation
+        # is not stored after it
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_load(
+        self, key: KeyT, load: Callable[[], Awaitable[ValueT]]
+    ) -> ValueT:
+        if self.ttl <= 0:
+            return await load()
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        generation = self._generation
+
+        value = await load()
+
+        if generation == self._generation:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, key: KeyT) -> None:
+        self._generation += 1
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+
+
+# username -> employee id, None for unknown usernames
+employee_ids: TTLCache[str, UUID | None] = TTLCache(
+    IDENTITY_CACHE_SIZE, IDENTITY_CACHE_TTL
+)
+# (organization id, employee id) -> whether the employee is responsible for it
+responsibles: TTLCache[tuple[UUID, UUID], bool] = TTLCache(
+    IDENTITY_CACHE_SIZE, IDENTITY_CACHE_TTL
+)
+
+
+# all memberships, when MEMBERSHIP_INDEX is enabled and the listener is connected
+memberships = MembershipIndex()
+
+
+@dataclass(frozen=True)
+class CachedPage:
+    body: bytes
+    headers: dict[str, str]
+
+
+def _page_types(
+    service_types: Collection[TenderServiceType] | None,
+) -> list[TenderServiceType]:
+    """Service types a page may contain: all of them unless it is filtered."""
+    return [t for t in TenderServiceType if not service_types or t in service_types]
+
+
+def _page_key(service_types: list[TenderServiceType], *params: object) -> str:
+    return ":".join([",".join(t.name for t in service_types), *map(str, params)])
+
+
+class TenderFeedCache(Protocol):
+    """
+    Rendered pages of the public tender feed. A page is cached together with
+    the generation of its service types; every change to a published tender
+    bumps the generations of its service types in the same transaction, so
+    only pages that may contain the tender stop matching.
+    """
+
+    @property
+    def hits(self) -> int: ...
+
+    @property
+    def misses(self) -> int: ...
+
+    async def get_or_load(
+        self,
+        service_types: Collection[TenderServiceType] | None,
+        params: tuple[object, ...],
+        load: Callable[[], Awaitable[CachedPage]],
+    ) -> CachedPage: ...
+
+    async def invalidate(
+        self, session: DbSession, service_types: Collection[TenderServiceType]
+    ) -> None:
+        """Called within the transaction that changes a published tender."""
+
+
+class MemoryTenderFeedCache:
+    """
+    Pages in this instance. Generations are kept here too and bumped by the
+    NOTIFY that invalidate sends, which reaches every instance on commit.
+    """
+
+    def __init__(self, maxsize: int, max_staleness: float) -> None:
+        self._pages: TTLCache[str, CachedPage] = TTLCache(maxsize, max_staleness)
+        self._generations = dict.fromkeys(TenderServiceType, 0)
+
+    @property
+    def hits(self) -> int:
+        return self._pages.hits
+
+    @property
+    def misses(self) -> int:
+        return self._pages.misses
+
+    async def get_or_load(
+        self,
+        service_types: Collection[TenderServiceType] | None,
+        params: tuple[object, ...],
+        load: Callable[[], Awaitable[CachedPage]],
+    ) -> CachedPage:
+        types = _page_types(service_types)
+        # a page loaded while the generation changes is stored under the old
+        # generation, where nobody looks for it anymore
+        generation = sum(self._generations[t] for t in types)
+        return await self._pages.get_or_load(
+            _page_key(types, generation, *params), load
+        )
+
+    def bump(self, service_types: Collection[TenderServiceType]) -> None:
+        for service_type in service_types:
+            self._generations[service_type] += 1
+
+    async def invalidate(
+        self, session: DbSession, service_types: Collection[TenderServiceType]
+    ) -> None:
+        payload = "tender_feed:" + ",".join(t.name for t in service_types)
+        await session.execute(select(func.pg_notify(NOTIFY_CHANNEL, payload)))
+        # right away here as well, for this instance to read its own writes; the
+        # NOTIFY bumps them again after the commit, dropping the pages loaded
+        # in between
+        self.bump(service_types)
+
+
+class PostgresTenderFeedCache:
+    """
+    Pages shared by all instances in an unlogged table on the primary, with
+    the generations in another table.
+    """
+
+    def __init__(self, max_staleness: float) -> None:
+        self.max_staleness = datetime.timedelta(seconds=max_staleness)
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_load(
+        self,
+        service_types: Collection[TenderServiceType] | None,
+        params: tuple[object, ...],
+        load: Callable[[], Awaitable[CachedPage]],
+    ) -> CachedPage:
+        types = _page_types(service_types)
+        key = _page_key(types, *params)
+        generation = (
+            select(
+                func.coalesce(func.sum(TenderFeedGeneration.generation), 0).label(
+                    "generation"
+                )
+            )
+            .where(TenderFeedGeneration.service_type.in_(types))
+            .subquery()
+        )
+        fresh_since = func.localtimestamp() - self.max_staleness
+        stmt = (
+            select(generation.c.generation, TenderFeedPage.body, TenderFeedPage.headers)
+            .select_from(generation)
+            .outerjoin(
+                TenderFeedPage,
+                and_(
+                    TenderFeedPage.key == key,
+                    TenderFeedPage.generation == generation.c.generation,
+                    TenderFeedPage.stored_at > fresh_since,
+                ),
+            )
+        )
+        # the generation is read before the page is loaded, so a change
+        # committed in between makes the stored page stale, never the reverse
+        [(current_generation, body, headers)] = await execute_on_primary(stmt)
+        if body is not None:
+            self.hits += 1
+            return CachedPage(body, headers)
+
+        self.misses += 1
+        page = await load()
+        upsert = insert(TenderFeedPage).values(
+            key=key, generation=current_generation, body=page.body, headers=page.headers
+        )
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[TenderFeedPage.key],
+            set_={
+                "generation": upsert.excluded.generation,
+                "body": upsert.excluded.body,
+                "headers": upsert.excluded.headers,
+                "stored_at": func.localtimestamp(),
+            },
+        )
+        prune = delete(TenderFeedPage).where(TenderFeedPage.stored_at <= fresh_since)
+        await execute_on_primary(prune, upsert)
+        return page
+
+    async def invalidate(
+        self, session: DbSession, service_types: Collection[TenderServiceType]
+    ) -> None:
+        stmt = insert(TenderFeedGeneration).values(
+            [{"service_type": t, "generation": 1} for t in service_types]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TenderFeedGeneration.service_type],
+            set_={"generation": TenderFeedGeneration.generation + 1},
+        )
+        await session.execute(stmt)
+
+
+tender_feed: TenderFeedCache | None = None
+if TENDER_FEED_CACHE == "memory":
+    tender_feed = MemoryTenderFeedCache(
+        TENDER_FEED_CACHE_SIZE, TENDER_FEED_CACHE_MAX_STALENESS
+    )
+elif TENDER_FEED_CACHE == "postgres":
+    tender_feed = PostgresTenderFeedCache(TENDER_FEED_CACHE_MAX_STALENESS)
+
+
+def _clear() -> None:
+    employee_ids.clear()
+    responsibles.clear()
+    memberships.replace(None)
+    if isinstance(tender_feed, MemoryTenderFeedCache):
+        tender_feed.bump(list(TenderServiceType))
+    tender_events.lag_all()
+
+
+def _on_notify(payload: str) -> tuple[UUID, UUID] | None:
+    """Invalidates cached entries. Returns the changed membership, if any."""
+    kind, _, key = payload.partition(":")
+    if kind == "employee":
+        if key:
+            employee_ids.invalidate(key)
+        else:
+            employee_ids.clear()
+    elif kind == "responsible":
+        organization_id, _, employee_id = key.partition(":")
+        if organization_id and employee_id:
+            membership = (UUID(organization_id), UUID(employee_id))
+            responsibles.invalidate(membership)
+            return membership
+        responsibles.clear()
+        memberships.replace(None)
+    elif kind == "tender_feed" and isinstance(tender_feed, MemoryTenderFeedCache):
+        tender_feed.bump([TenderServiceType[name] for name in key.split(",")])
+    elif kind == "tender_event":
+        tender_events.on_notify(key)
+    return None
+
+
+async def _refresh_memberships(
+    conn: connection, changed: set[tuple[UUID, UUID]]
+) -> None:
+    """Loads the membership index if it is unloaded, or re-reads changed rows."""
+    if not memberships.loaded:
+        started = time.monotonic()
+        members = await run_in_threadpool(fetch_memberships, conn)
+        memberships.replace(members)
+        logger.info(
+            "Loaded %d memberships of %d organizations in %.2fs, %d bytes",
+            memberships.memberships,
+            memberships.organizations,
+            time.monotonic() - started,
+            memberships.memory_bytes(),
+        )
+    elif changed:
+        # the notification only says that a pair changed, not whether it exists
+        existing = await run_in_threadpool(fetch_existing, conn, changed)
+        for organization_id, employee_id in changed:
+            memberships.set(
+                organization_id,
+                employee_id,
+                (organization_id, employee_id) in existing,
+            )
+
+
+def _connect() -> connection:
+    engine = get_engine()
+    cargs, cparams = engine.dialect.create_connect_args(engine.url)
+    conn = psycopg2.connect(*cargs, **cparams)
+    conn.autocommit = True
+    with conn.cursor() as cursor:
+        cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+    return conn
+
+
+async def listen_for_invalidations(retry_interval: float) -> None:
+    """
+    Keeps a dedicated connection listening for cache invalidations. Whenever the
+    connection is (re)established the caches are cleared and the membership
+    index is reloaded, since notifications sent while nobody listened are lost;
+    for the same reason tender event streams are ended. While it is down, cache
+    entries still expire after IDENTITY_CACHE_TTL and the membership index is
+    unloaded.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            conn = await run_in_threadpool(_connect)
+        except psycopg2.Error as e:
+            logger.warning("Cache invalidation listener can't connect: %s", e)
+            await asyncio.sleep(retry_interval)
+            continue
+
+        _clear()
+
+        # fileno() fails once the connection is closed, so it is kept for cleanup
+        fd = conn.fileno()
+        readable = asyncio.Event()
+        loop.add_reader(fd, readable.set)
+        try:
+            while True:
+                changed = set()
+                while conn.notifies:
+                    membership = _on_notify(conn.notifies.pop(0).payload)
+                    if membership is not None:
+                        changed.add(membership)
+                if MEMBERSHIP_INDEX:
+                    await _refresh_memberships(conn, changed)
+                    if conn.notifies:
+                        continue  # received while the refresh queried the database
+
+                await readable.wait()
+                readable.clear()
+                conn.poll()
+        except psycopg2.Error as e:
+            logger.warning("Cache invalidation listener disconnected: %s", e)
+            _clear()
+        finally:
+            loop.remove_reader(fd)
+            conn.close()
+        await asyncio.sleep(retry_interval)
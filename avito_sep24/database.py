@@ -1,9 +1,35 @@
 import datetime
+import itertools
+import logging
+import math
+import time
 import uuid
-from collections.abc import Iterator
-from typing import Any
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator, Sequence
+from contextvars import ContextVar
+from functools import cache, partial
+from typing import Any, TypeVar, cast
 
-from sqlalchemy import DateTime, Uuid, create_engine, func
+from anyio import CancelScope, CapacityLimiter, to_thread
+from fastapi import Request, Response
+from sqlalchemy import (
+    DateTime,
+    Engine,
+    Executable,
+    Result,
+    Row,
+    ScalarResult,
+    Uuid,
+    create_engine,
+    event,
+    func,
+    text,
+)
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import (
     Mapped,
     Session,
@@ -11,16 +37,132 @@ from sqlalchemy.orm import (
     mapped_column,
     sessionmaker,
 )
+from sqlalchemy.sql import Select
+from starlette.concurrency import run_in_threadpool
+
+from avito_sep24.env import (
+    DATABASE_MODE,
+    POSTGRES_ASYNC_DRIVER,
+    POSTGRES_CONN,
+    POSTGRES_MAX_OVERFLOW,
+    POSTGRES_MAX_QUERIES_PER_REQUEST,
+    POSTGRES_POOL_PRE_PING,
+    POSTGRES_POOL_RECYCLE,
+    POSTGRES_POOL_SIZE,
+    POSTGRES_POOL_TIMEOUT,
+    POSTGRES_REPLICA_CONNS,
+    POSTGRES_REPLICA_PIN_SECONDS,
+)
+from avito_sep24.pool import InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool
+from avito_sep24.replicas import ReplicaSet
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+pool_options: dict[str, Any] = {
+    "pool_size": POSTGRES_POOL_SIZE,
+    "max_overflow": POSTGRES_MAX_OVERFLOW,
+    "pool_timeout": POSTGRES_POOL_TIMEOUT,
+    "pool_recycle": POSTGRES_POOL_RECYCLE,
+    "pool_pre_ping": POSTGRES_POOL_PRE_PING,
+}
+
+
+# statements run by the current request, only counted when
+# POSTGRES_MAX_QUERIES_PER_REQUEST is set
+_request_queries: ContextVar[Iterator[int] | None] = ContextVar(
+    "request_queries", default=None
+)
+
+
+def _count_query(_conn: object, _cursor: object, statement: str, *_: object) -> None:
+    """Warns once per request, when it goes over the limit; never fails it."""
+    counter = _request_queries.get()
+    if counter is not None and next(counter) == POSTGRES_MAX_QUERIES_PER_REQUEST + 1:
+        logger.warning(
+            "Request ran more than %d queries, possibly N+1; the last one: %s",
+            POSTGRES_MAX_QUERIES_PER_REQUEST,
+            statement,
+        )
+
+
+def _create_sync_engine(url: str) -> Engine:
+    engine = create_engine(url, poolclass=InstrumentedQueuePool, **pool_options)
+    if POSTGRES_MAX_QUERIES_PER_REQUEST > 0:
+        event.listen(engine, "before_cursor_execute", _count_query)
+    return engine
+
+
+def _create_async_engine(url: str) -> AsyncEngine:
+    engine = create_async_engine(
+        url.replace("postgresql://", f"postgresql+{POSTGRES_ASYNC_DRIVER}://", 1),
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        **pool_options,
+    )
+    if POSTGRES_MAX_QUERIES_PER_REQUEST > 0:
+        event.listen(engine.sync_engine, "before_cursor_execute", _count_query)
+    return engine
+
 
-from avito_sep24.env import POSTGRES_CONN
+async def _ping_sync(sync_engine: Engine) -> None:
+    def ping() -> None:
+        with sync_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    await run_in_threadpool(ping)
+
+
+async def _ping_async(async_engine: AsyncEngine) -> None:
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+@cache
+def get_engine() -> Engine:
+    """Primary engine. Created on first use, so importing the app needs no DB."""
+    return _create_sync_engine(POSTGRES_CONN)
+
+
+@cache
+def get_async_engine() -> AsyncEngine:
+    return _create_async_engine(POSTGRES_CONN)
+
+
+@cache
+def get_replicas() -> ReplicaSet[Engine] | ReplicaSet[AsyncEngine]:
+    replicas: ReplicaSet[Engine] | ReplicaSet[AsyncEngine]
+    if DATABASE_MODE == "async":
+        replicas = ReplicaSet(
+            [_create_async_engine(url) for url in POSTGRES_REPLICA_CONNS],
+            _ping_async,
+        )
+        for replica in replicas.replicas:
+            event.listen(replica.engine.sync_engine, "handle_error", replica.on_error)
+    else:
+        replicas = ReplicaSet(
+            [_create_sync_engine(url) for url in POSTGRES_REPLICA_CONNS], _ping_sync
+        )
+        for replica in replicas.replicas:
+            event.listen(replica.engine, "handle_error", replica.on_error)
+    return replicas
+
+
+# expire_on_commit is disabled because refreshing expired attributes
+# would do implicit IO, which is not allowed in async mode
+make_session = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False)
+make_async_session = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+PRIMARY_PIN_COOKIE = "primary_until"
 
-engine = create_engine(POSTGRES_CONN)
-make_session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 RawBase: type[Any] = declarative_base()
 
 
 class Base(RawBase):
     __abstract__ = True
+    # fetch server-generated columns (created_at) with RETURNING on insert,
+    # so they don't have to be lazy loaded later
+    __mapper_args__ = {"eager_defaults": True}  # noqa: RUF012
 
     id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
     created_at: Mapped[datetime.datetime] = mapped_column(
@@ -34,9 +176,185 @@ class Base(RawBase):
     )
 
 
-def get_session() -> Iterator[Session]:
-    db = make_session()
+@cache
+def _transaction_limiter() -> CapacityLimiter:
+    # sessions in a transaction hold a connection, so their threads are bounded
+    # by the pools already
+    return CapacityLimiter(math.inf)
+
+
+class ThreadedSession:
+    """
+    Blocking Session with the subset of AsyncSession interface used by
+    repositories. Every call that may touch the database is run in the threadpool,
+    so a request holds a thread only while it waits for Postgres.
+    """
+
+    def __init__(self, session: Session) -> None:
+        self.sync_session = session
+
+    async def _run(self, func: Callable[..., T], *args: object) -> T:
+        """
+        Calls within a transaction bypass the default thread limit: otherwise
+        threads waiting on a lock could take all the tokens while the
+        transaction that holds the lock waits for one to commit.
+        """
+        if self.sync_session.in_transaction():
+            return await to_thread.run_sync(
+                partial(func, *args), limiter=_transaction_limiter()
+            )
+        return await run_in_threadpool(func, *args)
+
+    def add(self, instance: object) -> None:
+        self.sync_session.add(instance)
+
+    def add_all(self, instances: Iterable[object]) -> None:
+        self.sync_session.add_all(instances)
+
+    async def get(self, entity: type[T], ident: object) -> T | None:
+        return await self._run(self.sync_session.get, entity, ident)
+
+    async def scalar(self, statement: Select[tuple[T]]) -> T | None:
+        return await self._run(self.sync_session.scalar, statement)
+
+    async def scalars(self, statement: Select[tuple[T]]) -> ScalarResult[T]:
+        return await self._run(self.sync_session.scalars, statement)
+
+    async def execute(self, statement: Executable) -> Result[Any]:
+        return await self._run(self.sync_session.execute, statement)
+
+    async def flush(self) -> None:
+        await self._run(self.sync_session.flush)
+
+    async def commit(self) -> None:
+        await self._run(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await self._run(self.sync_session.rollback)
+
+    async def close(self) -> None:
+        await self._run(self.sync_session.close)
+
+
+DbSession = AsyncSession | ThreadedSession
+
+
+def get_pool() -> InstrumentedQueuePool:
+    """Returns the pool that serves requests in the current DATABASE_MODE."""
+    engine = (
+        get_async_engine().sync_engine if DATABASE_MODE == "async" else get_engine()
+    )
+    return cast(InstrumentedQueuePool, engine.pool)
+
+
+async def execute_on_primary(*statements: Executable) -> Sequence[Row[Any]]:
+    """
+    Runs the statements in their own transaction on the primary, outside of any
+    request session, and returns the rows of the last one.
+    """
+
+    def execute_sync() -> Sequence[Row[Any]]:
+        with get_engine().begin() as conn:
+            for statement in statements:
+                result = conn.execute(statement)
+            return result.all() if result.returns_rows else []
+
+    if DATABASE_MODE != "async":
+        return await run_in_threadpool(execute_sync)
+
+    async with get_async_engine().begin() as conn:
+        for statement in statements:
+            async_result = await conn.execute(statement)
+        return async_result.all() if async_result.returns_rows else []
+
+
+async def _stream_partitions_async(
+    engine: AsyncEngine, statement: Executable, size: int
+) -> AsyncIterator[Sequence[Row[Any]]]:
+    conn = engine.connect()
+    await conn.start()
+    try:
+        result = await conn.stream(statement, execution_options={"yield_per": size})
+        async for partition in result.partitions():
+            yield partition
+    finally:
+        # a disconnected client cancels the iteration, which must still
+        # return the connection to the pool
+        with CancelScope(shield=True):
+            await conn.close()
+
+
+async def _stream_partitions_sync(
+    engine: Engine, statement: Executable, size: int
+) -> AsyncIterator[Sequence[Row[Any]]]:
+    conn = await run_in_threadpool(engine.connect)
+    try:
+        result = await run_in_threadpool(
+            conn.execution_options(yield_per=size).execute, statement
+        )
+        partitions = result.partitions()
+        while partition := await run_in_threadpool(next, partitions, None):
+            yield partition
+    finally:
+        with CancelScope(shield=True):
+            await run_in_threadpool(conn.close)
+
+
+def stream_partitions(
+    statement: Executable, size: int
+) -> AsyncIterator[Sequence[Row[Any]]]:
+    """
+    Rows of the statement in batches of `size`, read from a server-side cursor
+    on a connection of its own (a replica, if one is up), so memory does not
+    grow with the result. The next batch is fetched only when the consumer
+    asks for it. The connection is held until the iteration ends.
+    """
+    replica = get_replicas().choose() if POSTGRES_REPLICA_CONNS else None
+    if DATABASE_MODE == "async":
+        async_engine = cast(AsyncEngine | None, replica) or get_async_engine()
+        return _stream_partitions_async(async_engine, statement, size)
+    engine = cast(Engine | None, replica) or get_engine()
+    return _stream_partitions_sync(engine, statement, size)
+
+
+def _use_replica(request: Request, response: Response) -> bool:
+    """
+    Sends GET requests to a replica, unless the same client has written something
+    during the last POSTGRES_REPLICA_PIN_SECONDS, so it can read its own writes.
+    """
+    if not POSTGRES_REPLICA_CONNS:
+        return False
+
+    if request.method not in ("GET", "HEAD"):
+        if POSTGRES_REPLICA_PIN_SECONDS > 0:
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE,
+                str(time.time() + POSTGRES_REPLICA_PIN_SECONDS),
+                max_age=math.ceil(POSTGRES_REPLICA_PIN_SECONDS),
+            )
+        return False
+
+    try:
+        pinned_until = float(request.cookies.get(PRIMARY_PIN_COOKIE, 0))
+    except ValueError:
+        pinned_until = 0
+    return pinned_until < time.time()
+
+
+async def get_session(request: Request, response: Response) -> AsyncIterator[DbSession]:
+    use_replica = _use_replica(request, response)
+    if POSTGRES_MAX_QUERIES_PER_REQUEST > 0:
+        # the threadpool copies the context, so queries in threads are counted too
+        _request_queries.set(itertools.count(1))
+
+    db: DbSession
+    if DATABASE_MODE == "async":
+        async_bind = get_replicas().choose() if use_replica else None
+        db = make_async_session(bind=async_bind or get_async_engine())
+    else:
+        bind = get_replicas().choose() if use_replica else None
+        db = ThreadedSession(make_session(bind=bind or get_engine()))
     try:
         yield db
     finally:
-        db.close()
+        await db.close()
@@ -1,5 +1,111 @@
 import os
 
-__all__ = ["POSTGRES_CONN"]
+__all__ = [
+    "POSTGRES_CONN",
+    "DATABASE_MODE",
+    "POSTGRES_ASYNC_DRIVER",
+    "POSTGRES_POOL_SIZE",
+    "POSTGRES_MAX_OVERFLOW",
+    "POSTGRES_POOL_TIMEOUT",
+    "POSTGRES_POOL_RECYCLE",
+    "POSTGRES_POOL_PRE_PING",
+    "POSTGRES_REPLICA_CONNS",
+    "POSTGRES_REPLICA_PIN_SECONDS",
+    "POSTGRES_REPLICA_CHECK_INTERVAL",
+    "POSTGRES_MAX_QUERIES_PER_REQUEST",
+    "IDENTITY_CACHE_TTL",
+    "IDENTITY_CACHE_SIZE",
+    "MEMBERSHIP_INDEX",
+    "POSTGRES_RENDER_JSON",
+    "TENDER_FEED_CACHE",
+    "TENDER_FEED_CACHE_SIZE",
+    "TENDER_FEED_CACHE_MAX_STALENESS",
+    "TENDER_EVENTS",
+    "TENDER_EVENTS_QUEUE_SIZE",
+    "CHANGE_FEED_TOKEN",
+]
+
+
+def _get_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.lower() in ("1", "true", "yes", "on")
+
 
 POSTGRES_CONN = os.environ["POSTGRES_CONN"].replace("postgres://", "postgresql://")
+
+# "sync" runs queries through psycopg2 in the threadpool,
+# "async" uses an AsyncEngine on the event loop
+DATABASE_MODE = os.environ.get("DATABASE_MODE", "sync")
+# "asyncpg" or "psycopg" (psycopg 3), only used in async mode
+POSTGRES_ASYNC_DRIVER = os.environ.get("POSTGRES_ASYNC_DRIVER", "asyncpg")
+
+if DATABASE_MODE not in ("sync", "async"):
+    raise ValueError(f"unknown DATABASE_MODE: {DATABASE_MODE!r}")
+
+# in sync mode the threadpool is limited to pool_size + max_overflow threads,
+# so requests wait for a thread instead of queueing on pool checkout
+POSTGRES_POOL_SIZE = int(os.environ.get("POSTGRES_POOL_SIZE", "20"))
+POSTGRES_MAX_OVERFLOW = int(os.environ.get("POSTGRES_MAX_OVERFLOW", "20"))
+# seconds to wait for a free connection before failing
+POSTGRES_POOL_TIMEOUT = float(os.environ.get("POSTGRES_POOL_TIMEOUT", "30"))
+# seconds after which a connection is reopened, -1 disables recycling
+POSTGRES_POOL_RECYCLE = int(os.environ.get("POSTGRES_POOL_RECYCLE", "-1"))
+POSTGRES_POOL_PRE_PING = _get_bool("POSTGRES_POOL_PRE_PING", False)
+
+# comma-separated connection strings of read replicas, used by GET requests
+POSTGRES_REPLICA_CONNS = [
+    conn.strip().replace("postgres://", "postgresql://")
+    for conn in os.environ.get("POSTGRES_REPLICA_CONNS", "").split(",")
+    if conn.strip()
+]
+# after a write, the client reads from the primary for this many seconds
+POSTGRES_REPLICA_PIN_SECONDS = float(
+    os.environ.get("POSTGRES_REPLICA_PIN_SECONDS", "5")
+)
+POSTGRES_REPLICA_CHECK_INTERVAL = float(
+    os.environ.get("POSTGRES_REPLICA_CHECK_INTERVAL", "5")
+)
+
+# requests that run more SQL statements than this are logged with a warning, to
+# catch N+1 queries during development; 0 disables the check
+POSTGRES_MAX_QUERIES_PER_REQUEST = int(
+    os.environ.get("POSTGRES_MAX_QUERIES_PER_REQUEST", "0")
+)
+
+# seconds to cache username -> employee and organization membership lookups,
+# 0 disables the cache. Entries are invalidated early through LISTEN/NOTIFY
+IDENTITY_CACHE_TTL = float(os.environ.get("IDENTITY_CACHE_TTL", "60"))
+IDENTITY_CACHE_SIZE = int(os.environ.get("IDENTITY_CACHE_SIZE", "10000"))
+
+# keep all organization memberships in memory, loaded on startup and refreshed
+# through LISTEN/NOTIFY, so membership checks don't query the database
+MEMBERSHIP_INDEX = _get_bool("MEMBERSHIP_INDEX", False)
+
+# let Postgres render the JSON of read-only list endpoints, skipping the ORM and
+# pydantic; the response bytes are the same
+POSTGRES_RENDER_JSON = _get_bool("POSTGRES_RENDER_JSON", False)
+
+# where to cache pages of the public tender feed: "memory" (in every instance,
+# invalidated through LISTEN/NOTIFY), "postgres" (shared by all instances) or
+# "off". Pages are invalidated when a published tender changes; max staleness
+# bounds how long a page is served if an invalidation is missed
+TENDER_FEED_CACHE = os.environ.get("TENDER_FEED_CACHE", "memory")
+TENDER_FEED_CACHE_SIZE = int(os.environ.get("TENDER_FEED_CACHE_SIZE", "1000"))
+TENDER_FEED_CACHE_MAX_STALENESS = float(
+    os.environ.get("TENDER_FEED_CACHE_MAX_STALENESS", "30")
+)
+
+if TENDER_FEED_CACHE not in ("memory", "postgres", "off"):
+    raise ValueError(f"unknown TENDER_FEED_CACHE: {TENDER_FEED_CACHE!r}")
+
+# stream tender publish, edit and close events on GET /api/tenders/events. Writes
+# send them through NOTIFY, every instance fans them out to its subscribers
+TENDER_EVENTS = _get_bool("TENDER_EVENTS", True)
+# events queued for a subscriber that does not keep up, before its stream ends
+TENDER_EVENTS_QUEUE_SIZE = int(os.environ.get("TENDER_EVENTS_QUEUE_SIZE", "100"))
+
+# bearer token of GET /api/tenders/changes, which returns tenders and bids of all
+# statuses to services that keep a copy in sync; the feed is disabled if unset
+CHANGE_FEED_TOKEN = os.environ.get("CHANGE_FEED_TOKEN", "")
@@ -0,0 +1,55 @@
+import hashlib
+from collections.abc import Iterable
+from typing import Annotated
+
+from fastapi import Header, Response
+
+from avito_sep24.schemas.bid import BidModel
+from avito_sep24.schemas.tender import TenderModel
+
+__all__ = [
+    "IfNoneMatch",
+    "entity_tag",
+    "model_tag",
+    "models_tag",
+    "is_not_modified",
+    "not_modified",
+]
+
+IfNoneMatch = Annotated[str | None, Header()]
+
+
+def entity_tag(keys: Iterable[tuple[object, ...]]) -> str:
+    """
+    Strong ETag of a response built from entities identified by `keys`. Every
+    field of a version is fixed by its index and the rest is the entity status,
+    so (id, version, status) keys validate a response without loading it.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for key in keys:
+        digest.update(":".join(map(str, key)).encode())
+        digest.update(b";")
+    return f'"{digest.hexdigest()}"'
+
+
+def models_tag(models: Iterable[TenderModel | BidModel]) -> str:
+    return entity_tag((model.id, model.version, model.status) for model in models)
+
+
+def model_tag(model: TenderModel | BidModel) -> str:
+    return models_tag([model])
+
+
+def is_not_modified(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison, as RFC 9110 requires for If-None-Match."""
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
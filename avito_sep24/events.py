@@ -0,0 +1,134 @@
+import asyncio
+import enum
+from collections.abc import Collection, Iterator
+from contextlib import contextmanager
+
+from avito_sep24.env import TENDER_EVENTS_QUEUE_SIZE
+from avito_sep24.schemas.tender import TenderServiceType
+
+__all__ = [
+    "TenderEventType",
+    "LAGGED_FRAME",
+    "KEEPALIVE_FRAME",
+    "TenderEventSubscriber",
+    "TenderEventBroker",
+    "tender_events",
+]
+
+
+class TenderEventType(enum.Enum):
+    # the tender entered the public feed
+    PUBLISHED = "published"
+    # a published tender got a new version, by an edit or a rollback
+    EDITED = "edited"
+    # the tender left the public feed, its status tells whether it was closed
+    # or moved back to Created
+    CLOSED = "closed"
+
+
+# the last frame sent to a subscriber that missed events, see TenderEventSubscriber
+LAGGED_FRAME = b"event: lagged\ndata: {}\n\n"
+# an SSE comment, keeps proxies from closing idle streams
+KEEPALIVE_FRAME = b": keepalive\n\n"
+
+
+def _frame(event_type: TenderEventType, body: str) -> bytes:
+    # the body is compact JSON, so it never spans several data lines
+    return f"event: {event_type.value}\ndata: {body}\n\n".encode()
+
+
+class TenderEventSubscriber:
+    """
+    Frames for one stream. A subscriber that does not keep up gets at most
+    `queue_size` frames queued; when the queue overflows they are dropped in
+    favor of LAGGED_FRAME, which ends the stream. The client is expected to
+    reload the list and subscribe again, instead of the instance buffering
+    events for it without bound or slowing down the other subscribers.
+    """
+
+    def __init__(
+        self, service_types: Collection[TenderServiceType] | None, queue_size: int
+    ) -> None:
+        self.service_types = frozenset(service_types or TenderServiceType)
+        self.lagged = False
+        self._queue: asyncio.Queue[bytes] = asyncio.Queue(queue_size)
+
+    def offer(self, frame: bytes) -> None:
+        if self.lagged:
+            return
+        try:
+            self._queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self.lag()
+
+    def lag(self) -> None:
+        if self.lagged:
+            return
+        self.lagged = True
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(LAGGED_FRAME)
+
+    async def get(self) -> bytes:
+        return await self._queue.get()
+
+
+class TenderEventBroker:
+    """
+    Fans out the tender events of all instances, received by the cache
+    invalidation listener (see cache.listen_for_invalidations), to the streams
+    of this instance. Only used from the event loop thread.
+    """
+
+    def __init__(self, queue_size: int) -> None:
+        self.queue_size = queue_size
+        self.published = 0
+        self._subscribers: set[TenderEventSubscriber] = set()
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    @contextmanager
+    def subscribe(
+        self, service_types: Collection[TenderServiceType] | None
+    ) -> Iterator[TenderEventSubscriber]:
+        subscriber = TenderEventSubscriber(service_types, self.queue_size)
+        self._subscribers.add(subscriber)
+        try:
+            yield subscriber
+        finally:
+            self._subscribers.discard(subscriber)
+
+    def publish(
+        self,
+        event_type: TenderEventType,
+        service_types: Collection[TenderServiceType],
+        body: str,
+    ) -> None:
+        """
+        An edit that changes the service type reaches the subscribers of both
+        the old and the new one.
+        """
+        self.published += 1
+        frame = _frame(event_type, body)
+        for subscriber in self._subscribers:
+            if not subscriber.service_types.isdisjoint(service_types):
+                subscriber.offer(frame)
+
+    def on_notify(self, key: str) -> None:
+        """`key` is "<event type>:<service type names>:<TenderModel JSON>"."""
+        event_type, _, rest = key.partition(":")
+        names, _, body = rest.partition(":")
+        self.publish(
+            TenderEventType(event_type),
+            [TenderServiceType[name] for name in names.split(",")],
+            body,
+        )
+
+    def lag_all(self) -> None:
+        """Ends all streams, when events may have been missed."""
+        for subscriber in self._subscribers:
+            subscriber.lag()
+
+
+tender_events = TenderEventBroker(TENDER_EVENTS_QUEUE_SIZE)
@@ -0,0 +1,144 @@
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Collection
+from uuid import UUID
+
+from psycopg2.extensions import connection
+
+__all__ = ["MembershipIndex", "fetch_memberships", "fetch_existing"]
+
+# organization id -> employee ids split into high and low 64 bits, sorted
+Members = dict[int, tuple[array, array]]
+
+_LOW_BITS = 64
+_LOW_MASK = (1 << _LOW_BITS) - 1
+
+
+def _split(value: int) -> tuple[int, int]:
+    return value >> _LOW_BITS, value & _LOW_MASK
+
+
+def _parse_uuid(value: str) -> int:
+    return int(value.replace("-", ""), 16)
+
+
+class MembershipIndex:
+    """
+    All organization memberships in memory, without a Python object per row:
+    every organization keeps two sorted arrays of unsigned 64-bit halves of its
+    responsible employee ids, so a membership costs 16 bytes plus the
+    per-organization overhead. Mutated only from the event loop thread.
+    """
+
+    def __init__(self) -> None:
+        self._members: Members | None = None
+        self.memberships = 0
+
+    @property
+    def organizations(self) -> int:
+        return len(self._members) if self._members else 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._members is not None
+
+    def replace(self, members: Members | None) -> None:
+        """Swaps in a freshly loaded index, or unloads it with None."""
+        self._members = members
+        self.memberships = (
+            sum(len(high) for high, _ in members.values()) if members else 0
+        )
+
+    def _find(self, organization_id: UUID, employee_id: UUID) -> tuple[bool, int]:
+        assert self._members is not None
+        members = self._members.get(organization_id.int)
+        if members is None:
+            return False, 0
+        high, low = members
+        employee_high, employee_low = _split(employee_id.int)
+        index = bisect_left(high, employee_high)
+        while index < len(high) and high[index] == employee_high:
+            if low[index] >= employee_low:
+                return low[index] == employee_low, index
+            index += 1
+        return False, index
+
+    def contains(self, organization_id: UUID, employee_id: UUID) -> bool:
+        return self._find(organization_id, employee_id)[0]
+
+    def set(self, organization_id: UUID, employee_id: UUID, member: bool) -> None:
+        assert self._members is not None
+        found, index = self._find(organization_id, employee_id)
+        if found == member:
+            return
+
+        high, low = self._members.setdefault(
+            organization_id.int, (array("Q"), array("Q"))
+        )
+        if member:
+            employee_high, employee_low = _split(employee_id.int)
+            high.insert(index, employee_high)
+            low.insert(index, employee_low)
+            self.memberships += 1
+        else:
+            del high[index]
+            del low[index]
+            self.memberships -= 1
+            if not high:
+                del self._members[organization_id.int]
+
+    def memory_bytes(self) -> int:
+        if self._members is None:
+            return 0
+        return sys.getsizeof(self._members) + sum(
+            sys.getsizeof(key)
+            + sys.getsizeof(members)
+            + sys.getsizeof(members[0])
+            + sys.getsizeof(members[1])
+            for key, members in self._members.items()
+        )
+
+
+def fetch_memberships(conn: connection) -> Members:
+    """Loads all memberships, ordered so that the arrays are built sorted."""
+    members: Members = {}
+    organization = None
+    high = low = array("Q")
+    # a server-side cursor, so the rows are not all held by the driver at once
+    with conn.cursor(name="membership_index", withhold=True) as cursor:
+        cursor.itersize = 10_000
+        # uuids are ordered bytewise, the same as their integer values
+        cursor.execute(
+            "SELECT organization_id::text, user_id::text"
+            " FROM organization_responsible ORDER BY organization_id, user_id"
+        )
+        for organization_id, user_id in cursor:
+            if organization_id != organization:
+                organization = organization_id
+                high, low = array("Q"), array("Q")
+                members[_parse_uuid(organization_id)] = (high, low)
+            employee_high, employee_low = _split(_parse_uuid(user_id))
+            if high and high[-1] == employee_high and low[-1] == employee_low:
+                continue  # the table does not forbid duplicates
+            high.append(employee_high)
+            low.append(employee_low)
+    return members
+
+
+def fetch_existing(
+    conn: connection, pairs: Collection[tuple[UUID, UUID]]
+) -> set[tuple[UUID, UUID]]:
+    """Returns which of the (organization, employee) pairs are memberships now."""
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT DISTINCT organization_id::text, user_id::text"
+            " FROM organization_responsible"
+            " WHERE (organization_id, user_id) IN"
+            " (SELECT * FROM unnest(%s::uuid[], %s::uuid[]))",
+            (
+                [str(organization_id) for organization_id, _ in pairs],
+                [str(employee_id) for _, employee_id in pairs],
+            ),
+        )
+        return {(UUID(o), UUID(e)) for o, e in cursor}
@@ -1,35 +1,96 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from anyio.to_thread import current_default_thread_limiter
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import NoResultFound
 from starlette.middleware.cors import CORSMiddleware
 from starlette.responses import JSONResponse
 
+from .cache import listen_for_invalidations
+from .database import get_replicas
+from .env import (
+    DATABASE_MODE,
+    IDENTITY_CACHE_TTL,
+    MEMBERSHIP_INDEX,
+    POSTGRES_MAX_OVERFLOW,
+    POSTGRES_POOL_SIZE,
+    POSTGRES_REPLICA_CHECK_INTERVAL,
+    POSTGRES_REPLICA_CONNS,
+    TENDER_EVENTS,
+    TENDER_FEED_CACHE,
+)
 from .errors import ClientRequestError
+from .routes import root_router
+from .schemas.pagination import NEXT_CURSOR_HEADER
 
-app = FastAPI()
 
-origins = ["*"]
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    if DATABASE_MODE == "sync" and POSTGRES_MAX_OVERFLOW >= 0:
+        # every thread holds at most one connection, so more threads than
+        # connections would only queue on pool checkout
+        limiter = current_default_thread_limiter()
+        limiter.total_tokens = POSTGRES_POOL_SIZE + POSTGRES_MAX_OVERFLOW
+
+    tasks = []
+    if POSTGRES_REPLICA_CONNS:
+        tasks.append(
+            asyncio.create_task(
+                get_replicas().run_checks(POSTGRES_REPLICA_CHECK_INTERVAL)
+            )
+        )
+    if (
+        IDENTITY_CACHE_TTL > 0
+        or MEMBERSHIP_INDEX
+        or TENDER_FEED_CACHE == "memory"
+        or TENDER_EVENTS
+    ):
+        tasks.append(asyncio.create_task(listen_for_invalidations(retry_interval=5)))
+
+    yield
+
+    for task in tasks:
+        task.cancel()
 
 
-@app.exception_handler(ClientRequestError)
 async def exc_400_handler(_: object, exc: ClientRequestError) -> JSONResponse:
     return JSONResponse({"reason": exc.reason}, status_code=exc.status_code)
 
 
-@app.exception_handler(NoResultFound)
 async def not_found_handler(_: object, __: NoResultFound) -> JSONResponse:
     return JSONResponse({"reason": "object not found"}, status_code=404)
 
 
-@app.exception_handler(RequestValidationError)
 async def invalid_schema_handler(
     _: object, exc: RequestValidationError
 ) -> JSONResponse:
     return JSONResponse({"reason": f"validation error: {exc}"}, status_code=400)
+
+
+def create_app() -> FastAPI:
+    """
+    Builds the application. Nothing here touches the database: engines are created
+    on first use and the schema is created by `python -m avito_sep24.bootstrap`.
+    """
+    app = FastAPI(lifespan=lifespan)
+
+    origins = ["*"]
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
+    )
+
+    app.add_exception_handler(ClientRequestError, exc_400_handler)
+    app.add_exception_handler(NoResultFound, not_found_handler)
+    app.add_exception_handler(RequestValidationError, invalid_schema_handler)
+
+    app.include_router(root_router)
+
+    return app
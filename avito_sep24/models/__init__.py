@@ -1,10 +1,9 @@
-from avito_sep24.database import RawBase, engine
-
 from .bid import Bid, BidDecision, BidVersion
 from .bid_review import BidReview
 from .employee import Employee
 from .organization import Organization, OrganizationResponsible
 from .tender import Tender, TenderVersion
+from .tender_feed import TenderFeedGeneration, TenderFeedPage
 
 __all__ = [
     "Employee",
@@ -16,7 +15,6 @@ __all__ = [
     "BidVersion",
     "BidReview",
     "BidDecision",
+    "TenderFeedGeneration",
+    "TenderFeedPage",
 ]
-
-
-RawBase.metadata.create_all(engine)
@@ -1,25 +1,31 @@
+from typing import Any
 from uuid import UUID
 
 from sqlalchemy import (
-    Boolean,
+    Column,
+    Computed,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
     UniqueConstraint,
     Uuid,
 )
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Mapped, QueryableAttribute, mapped_column, relationship
 
 from avito_sep24.database import Base
 from avito_sep24.schemas.bid import BidAuthorType, BidDecisionType, BidModel, BidStatus
 
+from .change import ChangeTracked
 from .employee import Employee
+from .search import search_document
 from .tender import Tender
 
 
-class Bid(Base):
+class Bid(ChangeTracked, Base):
     __tablename__ = "bid"
 
     status: Mapped[BidStatus] = mapped_column(
@@ -28,26 +34,77 @@ class Bid(Base):
     tender_id: Mapped[UUID] = mapped_column(
         Uuid, ForeignKey("tender.id"), nullable=False
     )
-    tender: Mapped[Tender] = relationship(Tender)
+    tender: Mapped[Tender] = relationship(Tender, lazy="joined")
     author_type: Mapped[BidAuthorType] = mapped_column(
         Enum(BidAuthorType), nullable=False
     )
     author_id: Mapped[UUID] = mapped_column(Uuid, nullable=False)
+    # points to the current BidVersion, see Tender.current_version_id
+    current_version_id: Mapped[UUID] = mapped_column(
+        Uuid,
+        ForeignKey(
+            "bid_version.id",
+            name="fk_bid_current_version",
+            use_alter=True,
+            deferrable=True,
+            initially="DEFERRED",
+        ),
+        nullable=False,
+    )
+    # approvals counted so far, see BidRepository.submit_decision
+    approvals: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+
+    # both bid lists are paginated by (created_at, id) within their filter
+    __table_args__ = (
+        Index(
+            "ix_bid_tender_id_status_created_at",
+            "tender_id",
+            "status",
+            "created_at",
+            "id",
+        ),
+        Index(
+            "ix_bid_author_created_at", "author_type", "author_id", "created_at", "id"
+        ),
+        # the change feed, see ChangeTracked
+        Index("ix_bid_change", "change_xid", "change_seq"),
+    )
 
 
 class BidVersion(Base):
     __tablename__ = "bid_version"
 
     bid_id: Mapped[UUID] = mapped_column(Uuid, ForeignKey("bid.id"), nullable=False)
-    bid: Mapped[Bid] = relationship(Bid)
+    bid: Mapped[Bid] = relationship(Bid, foreign_keys=bid_id, lazy="joined")
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     description: Mapped[str] = mapped_column(Text(), nullable=False)
     index: Mapped[int] = mapped_column(Integer, nullable=False)
-    actual: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
 
     __table_args__ = (
         UniqueConstraint("bid_id", "index", name="unique_bid_version_index"),
+        # see TenderVersion
+        Column("search_vector", TSVECTOR, Computed(search_document())),
+        Index("ix_bid_version_search_vector", "search_vector", postgresql_using="gin"),
     )
+    __mapper_args__: dict[str, Any] = {  # noqa: RUF012
+        **Base.__mapper_args__,
+        "exclude_properties": ["search_vector"],
+    }
+
+    @staticmethod
+    def model_columns() -> dict[str, QueryableAttribute[Any]]:
+        """Columns of BidModel fields, as in as_model; Bid must be joined."""
+        return {
+            "id": BidVersion.bid_id,
+            "name": BidVersion.name,
+            "description": BidVersion.description,
+            "tender_id": Bid.tender_id,
+            "author_type": Bid.author_type,
+            "author_id": Bid.author_id,
+            "version": BidVersion.index,
+            "created_at": Bid.created_at,
+            "status": Bid.status,
+        }
 
     def as_model(self) -> BidModel:
         return BidModel(
@@ -67,11 +124,12 @@ class BidDecision(Base):
     __tablename__ = "bid_decision"
 
     bid_id: Mapped[UUID] = mapped_column(Uuid, ForeignKey("bid.id"), nullable=False)
-    bid: Mapped[Bid] = relationship(Bid)
+    # loaded explicitly when needed, a lazy load would be a query per decision
+    bid: Mapped[Bid] = relationship(Bid, lazy="raise")
     author_id: Mapped[UUID] = mapped_column(
         Uuid, ForeignKey("employee.id"), nullable=False
     )
-    author: Mapped[Employee] = relationship(Employee)
+    author: Mapped[Employee] = relationship(Employee, lazy="raise")
     decision: Mapped[BidDecisionType] = mapped_column(
         Enum(BidDecisionType), nullable=False
     )
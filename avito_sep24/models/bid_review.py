@@ -1,6 +1,6 @@
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, Text, Uuid
+from sqlalchemy import ForeignKey, Index, Text, Uuid
 from sqlalchemy.orm import Mapped, mapped_column
 
 from avito_sep24.database import Base
@@ -14,3 +14,8 @@ class BidReview(Base):
         Uuid, ForeignKey("employee.id"), nullable=False
     )
     description: Mapped[str] = mapped_column(Text, nullable=False)
+
+    # the reviews of a bid in the (created_at, id) pagination order
+    __table_args__ = (
+        Index("ix_bid_review_bid_id_created_at", "bid_id", "created_at", "id"),
+    )
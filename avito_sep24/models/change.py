@@ -0,0 +1,26 @@
+from sqlalchemy import BigInteger, Sequence
+from sqlalchemy.orm import Mapped, declarative_mixin, mapped_column
+
+from avito_sep24.database import RawBase
+
+__all__ = ["CHANGE_SEQUENCE", "ChangeTracked"]
+
+# shared by tenders and bids, so their changes form one order
+CHANGE_SEQUENCE = Sequence("change_seq", metadata=RawBase.metadata)
+
+
+@declarative_mixin
+class ChangeTracked:
+    """
+    Position of the last change in the change feed, stamped by a trigger on
+    insert and on every new version or status (see bootstrap.CHANGE_TRIGGERS
+    and repositories.change).
+    """
+
+    # id of the transaction that made the change, pg_current_xact_id() as a number
+    change_xid: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default="0"
+    )
+    change_seq: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default="0"
+    )
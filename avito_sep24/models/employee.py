@@ -1,4 +1,4 @@
-from sqlalchemy import String
+from sqlalchemy import Index, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from avito_sep24.database import Base
@@ -10,3 +10,6 @@ class Employee(Base):
     username: Mapped[str] = mapped_column(String(length=50), nullable=False)
     first_name: Mapped[str | None] = mapped_column(String(length=50))
     last_name: Mapped[str | None] = mapped_column(String(length=50))
+
+    # same name as the index behind the UNIQUE constraint from schema.sql
+    __table_args__ = (Index("employee_username_key", "username", unique=True),)
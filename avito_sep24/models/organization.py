@@ -2,6 +2,7 @@ from uuid import UUID
 
 from sqlalchemy import (
     ForeignKey,
+    Index,
     String,
     Text,
     Uuid,
@@ -29,3 +30,7 @@ class OrganizationResponsible(RawBase):
     user_id: Mapped[UUID] = mapped_column(
         Uuid, ForeignKey("employee.id", ondelete="CASCADE")
     )
+
+    __table_args__ = (
+        Index("ix_organization_responsible", "organization_id", "user_id"),
+    )
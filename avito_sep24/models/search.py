@@ -0,0 +1,17 @@
+__all__ = ["SEARCH_CONFIGS", "search_document"]
+
+# text search configurations the versions are indexed with
+SEARCH_CONFIGS = ("russian", "english")
+
+
+def search_document() -> str:
+    """
+    SQL of the generated tsvector of a version. The name weighs more than the
+    description, and both are stemmed with every configuration, so a query in
+    either language matches without knowing which one the text is in.
+    """
+    return " || ".join(
+        f"setweight(to_tsvector('{config}', {column}), '{weight}')"
+        for column, weight in (("name", "A"), ("description", "B"))
+        for config in SEARCH_CONFIGS
+    )
@@ -1,29 +1,57 @@
+from typing import Any
 from uuid import UUID
 
 from sqlalchemy import (
-    Boolean,
+    Column,
+    Computed,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
     UniqueConstraint,
     Uuid,
 )
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Mapped, QueryableAttribute, mapped_column, relationship
 
 from avito_sep24.database import Base
 from avito_sep24.schemas.tender import TenderModel, TenderServiceType, TenderStatus
 
+from .change import ChangeTracked
+from .search import search_document
 
-class Tender(Base):
+
+class Tender(ChangeTracked, Base):
     __tablename__ = "tender"
 
     status = mapped_column(
-        Enum(TenderStatus), nullable=False, default=TenderStatus.CREATED
+        Enum(TenderStatus), nullable=False, default=TenderStatus.CREATED, index=True
     )
     organization_id = mapped_column(Uuid, ForeignKey("organization.id"), nullable=False)
-    creator_id = mapped_column(Uuid, ForeignKey("employee.id"), nullable=False)
+    creator_id = mapped_column(
+        Uuid, ForeignKey("employee.id"), nullable=False, index=True
+    )
+    # points to the current TenderVersion; the constraint is deferred, so a tender
+    # can be inserted before its first version within one transaction.
+    # Indexed to walk versions in name order and look up their tenders.
+    current_version_id: Mapped[UUID] = mapped_column(
+        Uuid,
+        ForeignKey(
+            "tender_version.id",
+            name="fk_tender_current_version",
+            use_alter=True,
+            deferrable=True,
+            initially="DEFERRED",
+        ),
+        nullable=False,
+        index=True,
+        unique=True,
+    )
+
+    # the change feed, see ChangeTracked
+    __table_args__ = (Index("ix_tender_change", "change_xid", "change_seq"),)
 
 
 class TenderVersion(Base):
@@ -32,18 +60,44 @@ class TenderVersion(Base):
     tender_id: Mapped[UUID] = mapped_column(
         Uuid, ForeignKey("tender.id"), nullable=False
     )
-    tender: Mapped[Tender] = relationship(Tender)
+    tender: Mapped[Tender] = relationship(Tender, foreign_keys=tender_id, lazy="joined")
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     description: Mapped[str] = mapped_column(Text, nullable=False)
     service_type: Mapped[TenderServiceType] = mapped_column(
         Enum(TenderServiceType), nullable=False
     )
     index: Mapped[int] = mapped_column(Integer, nullable=False)
-    actual: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
 
     __table_args__ = (
         UniqueConstraint("tender_id", "index", name="unique_tender_version_index"),
+        # keyset pagination of the public tender list, ordered by name
+        Index("ix_tender_version_name_id", "name", "id"),
+        # the full-text search document, generated so that Postgres keeps it in
+        # sync with the name and description; see repositories.search
+        Column("search_vector", TSVECTOR, Computed(search_document())),
+        Index(
+            "ix_tender_version_search_vector", "search_vector", postgresql_using="gin"
+        ),
     )
+    # not mapped, so the ORM neither loads it nor fetches it back on insert
+    __mapper_args__: dict[str, Any] = {  # noqa: RUF012
+        **Base.__mapper_args__,
+        "exclude_properties": ["search_vector"],
+    }
+
+    @staticmethod
+    def model_columns() -> dict[str, QueryableAttribute[Any]]:
+        """Columns of TenderModel fields, as in as_model; Tender must be joined."""
+        return {
+            "id": TenderVersion.tender_id,
+            "name": TenderVersion.name,
+            "description": TenderVersion.description,
+            "service_type": TenderVersion.service_type,
+            "status": Tender.status,
+            "version": TenderVersion.index,
+            "created_at": Tender.created_at,
+            "organization_id": Tender.organization_id,
+        }
 
     def as_model(self) -> TenderModel:
         return TenderModel(
@@ -0,0 +1,36 @@
+import datetime
+from typing import Any
+
+from sqlalchemy import JSON, BigInteger, DateTime, Enum, LargeBinary, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from avito_sep24.database import RawBase
+from avito_sep24.schemas.tender import TenderServiceType
+
+
+class TenderFeedGeneration(RawBase):
+    """Bumped in the same transaction as every change to the public tender feed."""
+
+    __tablename__ = "tender_feed_generation"
+
+    service_type: Mapped[TenderServiceType] = mapped_column(
+        Enum(TenderServiceType), primary_key=True
+    )
+    generation: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+class TenderFeedPage(RawBase):
+    """Rendered page of the public tender feed, see avito_sep24.cache."""
+
+    __tablename__ = "tender_feed_page"
+    # a cache: not worth the WAL, and it is fine to lose it on a crash
+    __table_args__ = {"prefixes": ["UNLOGGED"]}  # noqa: RUF012
+
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    # sum of the generations of the page's service types when it was loaded
+    generation: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    body: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    headers: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+    stored_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, server_default=func.localtimestamp(), nullable=False
+    )
@@ -0,0 +1,56 @@
+import threading
+import time
+from functools import cached_property
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection, QueuePool
+
+__all__ = [
+    "CheckoutStats",
+    "InstrumentedQueuePool",
+    "InstrumentedAsyncAdaptedQueuePool",
+]
+
+
+class CheckoutStats:
+    """Counts connection checkouts and the time callers spent waiting for them."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.checkouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def begin(self) -> None:
+        with self._lock:
+            self.waiting += 1
+
+    def end(self, wait_time: float) -> None:
+        with self._lock:
+            self.waiting -= 1
+            self.checkouts += 1
+            self.wait_time_total += wait_time
+            self.wait_time_max = max(self.wait_time_max, wait_time)
+
+    @property
+    def wait_time_avg(self) -> float:
+        return self.wait_time_total / self.checkouts if self.checkouts else 0.0
+
+
+class InstrumentedQueuePool(QueuePool):
+    @cached_property
+    def checkout_stats(self) -> CheckoutStats:
+        return CheckoutStats()
+
+    def connect(self) -> PoolProxiedConnection:
+        stats = self.checkout_stats
+        stats.begin()
+        started_at = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            stats.end(time.perf_counter() - started_at)
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    pass
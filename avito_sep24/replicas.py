@@ -0,0 +1,67 @@
+import asyncio
+import itertools
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Generic, TypeVar
+
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.exc import SQLAlchemyError
+
+__all__ = ["Replica", "ReplicaSet"]
+
+logger = logging.getLogger(__name__)
+
+EngineT = TypeVar("EngineT")
+
+
+class Replica(Generic[EngineT]):
+    def __init__(self, engine: EngineT) -> None:
+        self.engine = engine
+        self.healthy = True
+
+    def on_error(self, context: ExceptionContext) -> None:
+        # no connection means the replica could not be connected to at all
+        if context.connection is None or context.is_disconnect:
+            self.healthy = False
+
+
+class ReplicaSet(Generic[EngineT]):
+    """
+    Read replicas picked in round-robin order. A replica is skipped after a failed
+    connection until the next successful health check.
+    """
+
+    def __init__(
+        self, engines: list[EngineT], ping: Callable[[EngineT], Awaitable[None]]
+    ) -> None:
+        self.replicas = [Replica(engine) for engine in engines]
+        self._ping = ping
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self.replicas)
+
+    def choose(self) -> EngineT | None:
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._counter) % len(self.replicas)]
+            if replica.healthy:
+                return replica.engine
+        return None
+
+    async def check(self, timeout: float) -> None:
+        for index, replica in enumerate(self.replicas):
+            try:
+                await asyncio.wait_for(self._ping(replica.engine), timeout)
+            except (SQLAlchemyError, OSError) as e:
+                if replica.healthy:
+                    logger.warning("Replica #%d is down: %s", index, e)
+                replica.healthy = False
+            else:
+                if not replica.healthy:
+                    logger.info("Replica #%d is up again", index)
+                replica.healthy = True
+
+    async def run_checks(self, interval: float) -> None:
+        while True:
+            await self.check(timeout=interval)
+            await asyncio.sleep(interval)
@@ -0,0 +1,188 @@
+import enum
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import Annotated, Generic, TypeVar
+from uuid import UUID
+
+from fastapi import Depends
+from sqlalchemy import ColumnElement, Exists, exists, literal, select
+from sqlalchemy.orm import InstrumentedAttribute, aliased, contains_eager
+
+from avito_sep24.database import DbSession, get_session
+from avito_sep24.errors import assert401, assert403, assert404
+from avito_sep24.models import Bid, Employee, OrganizationResponsible, Tender
+from avito_sep24.schemas.bid import BidAuthorType, BidStatus
+from avito_sep24.schemas.tender import TenderStatus
+
+EntityT = TypeVar("EntityT")
+
+
+class AccessDecision(enum.Enum):
+    ALLOWED = "allowed"
+    UNAUTHORIZED = "unauthorized"  # no employee with such username
+    NOT_FOUND = "not_found"
+    FORBIDDEN = "forbidden"
+
+
+class TenderPolicy(enum.Enum):
+    READ = "read"  # published, or responsible for the organization
+    WRITE = "write"  # responsible for the organization
+
+
+class BidPolicy(enum.Enum):
+    READ = "read"  # WRITE, or published and responsible for the tender
+    WRITE = "write"  # the author, or responsible for the author organization
+    REVIEW = "review"  # responsible for the organization of the tender
+
+
+@dataclass(frozen=True)
+class Access(Generic[EntityT]):
+    decision: AccessDecision
+    entity: EntityT | None = None
+    employee_id: UUID | None = None
+
+    def allowed_entity(self, not_found_reason: str = "not found") -> EntityT:
+        """Returns the entity or raises the error matching the decision."""
+        assert401(
+            self.decision != AccessDecision.UNAUTHORIZED,
+            "no employee found with such username",
+        )
+        assert404(self.decision != AccessDecision.NOT_FOUND, not_found_reason)
+        assert403(self.decision == AccessDecision.ALLOWED)
+        assert self.entity is not None
+        return self.entity
+
+
+class AccessRepository:
+    """
+    Resolves the employee, the entity and the employee's responsibilities
+    in a single statement, so authorizing a request is one round trip.
+    """
+
+    def __init__(self, session: DbSession) -> None:
+        self.session = session
+
+    @staticmethod
+    def _is_responsible(
+        organization_id: ColumnElement[UUID] | InstrumentedAttribute[UUID],
+    ) -> Exists:
+        return exists().where(
+            OrganizationResponsible.organization_id == organization_id,
+            OrganizationResponsible.user_id == Employee.id,
+        )
+
+    @staticmethod
+    def _decide(
+        username: str | None,
+        employee_id: UUID | None,
+        entity: EntityT | None,
+        allowed: bool,
+    ) -> Access[EntityT]:
+        if username is not None and employee_id is None:
+            return Access(AccessDecision.UNAUTHORIZED)
+        if entity is None:
+            return Access(AccessDecision.NOT_FOUND, employee_id=employee_id)
+        if not allowed:
+            return Access(AccessDecision.FORBIDDEN, entity, employee_id)
+        return Access(AccessDecision.ALLOWED, entity, employee_id)
+
+    async def check_tender(
+        self, tender_id: UUID | None, username: str | None, policy: TenderPolicy
+    ) -> Access[Tender]:
+        """`username` may be None for anonymous reads of published tenders."""
+        # outer joins from a one-row anchor, so a missing employee or tender
+        # still yields a row
+        anchor = select(literal(1)).subquery()
+        stmt = (
+            select(
+                Employee.id,
+                Tender,
+                self._is_responsible(Tender.organization_id),
+            )
+            .select_from(anchor)
+            .outerjoin(Employee, Employee.username == username)
+            .outerjoin(Tender, Tender.id == tender_id)
+        )
+        employee_id, tender, is_responsible = (await self.session.execute(stmt)).one()
+
+        allowed = is_responsible
+        if policy == TenderPolicy.READ and tender is not None:
+            allowed = allowed or tender.status == TenderStatus.PUBLISHED
+        return self._decide(username, employee_id, tender, allowed)
+
+    async def check_bid(
+        self, bid_id: UUID | None, username: str, policy: BidPolicy
+    ) -> Access[Bid]:
+        anchor = select(literal(1)).subquery()
+        stmt = (
+            select(
+                Employee.id,
+                Bid,
+                self._is_responsible(Bid.author_id),
+                self._is_responsible(Tender.organization_id),
+            )
+            .select_from(anchor)
+            .outerjoin(Employee, Employee.username == username)
+            .outerjoin(Bid, Bid.id == bid_id)
+            .outerjoin(Tender, Tender.id == Bid.tender_id)
+            .options(contains_eager(Bid.tender))
+        )
+        row = (await self.session.execute(stmt)).one()
+        employee_id, bid, responsible_for_author, responsible_for_tender = row
+
+        allowed = False
+        if bid is not None:
+            if bid.author_type == BidAuthorType.USER:
+                can_write = bid.author_id == employee_id
+            else:
+                can_write = responsible_for_author
+
+            if policy == BidPolicy.WRITE:
+                allowed = can_write
+            elif policy == BidPolicy.READ:
+                allowed = can_write or (
+                    bid.status == BidStatus.PUBLISHED and responsible_for_tender
+                )
+            else:
+                allowed = responsible_for_tender
+        return self._decide(username, employee_id, bid, allowed)
+
+    async def check_author_reviews(
+        self, tender_id: UUID | None, username: str, author_username: str
+    ) -> Access[UUID]:
+        """
+        Employees responsible for the organization of a tender may read the
+        reviews on the bids of anyone who bid on it. The entity is the author id,
+        found only if the author has a bid on the tender.
+        """
+        author = aliased(Employee)
+        has_bid = exists().where(
+            Bid.tender_id == Tender.id,
+            Bid.author_type == BidAuthorType.USER,
+            Bid.author_id == author.id,
+        )
+        anchor = select(literal(1)).subquery()
+        stmt = (
+            select(
+                Employee.id,
+                author.id,
+                has_bid,
+                self._is_responsible(Tender.organization_id),
+            )
+            .select_from(anchor)
+            .outerjoin(Employee, Employee.username == username)
+            .outerjoin(Tender, Tender.id == tender_id)
+            .outerjoin(author, author.username == author_username)
+        )
+        row = (await self.session.execute(stmt)).one()
+        employee_id, author_id, has_bid, is_responsible = row
+
+        return self._decide(
+            username, employee_id, author_id if has_bid else None, is_responsible
+        )
+
+
+async def get_access_repository(
+    session: Annotated[DbSession, Depends(get_session)],
+) -> AsyncIterator[AccessRepository]:
+    yield AccessRepository(session)
@@ -1,172 +1,655 @@
-from collections.abc import Iterator
-from typing import Annotated
-from uuid import UUID
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+from typing import Annotated, Any, NamedTuple
+from uuid import UUID, uuid4
 
 from fastapi import Depends
-from sqlalchemy import select, update
+from sqlalchemy import (
+    REAL,
+    Select,
+    Uuid,
+    cast,
+    func,
+    literal,
+    select,
+    true,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import NoResultFound
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import aliased, contains_eager
 
-from avito_sep24.database import get_session
-from avito_sep24.models import Bid, BidReview, BidVersion
-from avito_sep24.repositories.organization import OrganizationRepository
-from avito_sep24.schemas.bid import BidAuthorType, BidStatus
+from avito_sep24.cache import tender_feed
+from avito_sep24.database import DbSession, get_session
+from avito_sep24.errors import assert400
+from avito_sep24.events import TenderEventType
+from avito_sep24.models import (
+    Bid,
+    BidDecision,
+    BidReview,
+    BidVersion,
+    OrganizationResponsible,
+    Tender,
+    TenderVersion,
+)
+from avito_sep24.repositories.rendering import json_object
+from avito_sep24.repositories.search import SearchMatch
+from avito_sep24.repositories.tender import notify_tender_event
+from avito_sep24.schemas.bid import (
+    BidAuthorType,
+    BidDecisionType,
+    BidModel,
+    BidStatus,
+)
+from avito_sep24.schemas.tender import TenderStatus
+
+# approvals that accept a bid, unless the organization of the tender has fewer
+# responsible employees
+MAX_QUORUM = 3
+
+
+class NewBid(NamedTuple):
+    name: str
+    description: str
+    tender_id: UUID
+    author_type: BidAuthorType
+    author_id: UUID
 
 
 class BidRepository:
-    def __init__(self, session: Session) -> None:
+    def __init__(self, session: DbSession) -> None:
         self.session = session
 
-    def create_as_version(
-        self,
+    @staticmethod
+    def _select_current_versions() -> Select[tuple[BidVersion]]:
+        return (
+            select(BidVersion)
+            .join(Bid, Bid.current_version_id == BidVersion.id)
+            .options(contains_eager(BidVersion.bid))
+        )
+
+    @staticmethod
+    def _paginate(
+        stmt: Select[tuple[BidVersion]],
+        limit: int,
+        offset: int,
+        after: tuple[datetime, UUID] | None,
+    ) -> Select[tuple[BidVersion]]:
+        if after is not None:
+            # the cursor is passed instead of the offset, see
+            # TenderRepository.get_public_paginated
+            stmt = stmt.filter(tuple_(Bid.created_at, Bid.id) > after)
+            offset = 0
+        return stmt.order_by(Bid.created_at, Bid.id).offset(offset).limit(limit)
+
+    @staticmethod
+    def _new_version(
         name: str,
         description: str,
         tender_id: UUID,
         author_type: BidAuthorType,
         author_id: UUID,
     ) -> BidVersion:
+        version_id = uuid4()
         bid = Bid(
             tender_id=tender_id,
             author_type=author_type,
             author_id=author_id,
+            current_version_id=version_id,
         )
-        bid_version = BidVersion(
+        return BidVersion(
+            id=version_id,
             bid=bid,
             name=name,
             description=description,
             index=1,
         )
 
-        self.session.add(bid)
-        self.session.add(bid_version)
-        self.session.commit()
+    async def create_as_version(
+        self,
+        name: str,
+        description: str,
+        tender_id: UUID,
+        author_type: BidAuthorType,
+        author_id: UUID,
+    ) -> BidModel:
+        """Inserts the bid and its first version in one statement."""
+        bid_id, version_id = uuid4(), uuid4()
+        bid = (
+            insert(Bid)
+            .values(
+                id=bid_id,
+                status=BidStatus.CREATED,
+                tender_id=tender_id,
+                author_type=author_type,
+                author_id=author_id,
+                current_version_id=version_id,
+            )
+            .returning(Bid.status, Bid.created_at)
+            .cte("bid")
+        )
+        version = (
+            insert(BidVersion)
+            .values(
+                id=version_id,
+                bid_id=bid_id,
+                name=name,
+                description=description,
+                index=1,
+            )
+            .returning(BidVersion.index)
+            .cte("version")
+        )
+        # both are single rows
+        stmt = select(bid, version).join_from(bid, version, true())
+        row = (await self.session.execute(stmt)).one()
+        await self.session.commit()
+
+        return BidModel(
+            id=bid_id,
+            name=name,
+            description=description,
+            author_type=author_type,
+            created_at=row.created_at,
+            status=row.status,
+            tender_id=tender_id,
+            author_id=author_id,
+            version=row.index,
+        )
 
-        return bid_version
+    async def create_many_as_versions(self, bids: Sequence[NewBid]) -> list[BidVersion]:
+        """See TenderRepository.create_many_as_versions."""
+        bid_versions = [
+            self._new_version(
+                bid.name, bid.description, bid.tender_id, bid.author_type, bid.author_id
+            )
+            for bid in bids
+        ]
+
+        self.session.add_all([version.bid for version in bid_versions])
+        self.session.add_all(bid_versions)
+        await self.session.commit()
 
-    def find_by_id(self, bid_id: UUID) -> Bid | None:
-        return self.session.get(Bid, bid_id)
+        return bid_versions
 
-    def get_version_by_id(self, bid_id: UUID, index: int) -> BidVersion:
-        stmt = select(BidVersion).filter(
-            BidVersion.bid_id == bid_id,
-            BidVersion.index == index,
+    async def find_by_id(self, bid_id: UUID) -> Bid | None:
+        return await self.session.get(Bid, bid_id)
+
+    def _select_published(
+        self,
+        tender_id: UUID,
+        limit: int,
+        offset: int,
+        after: tuple[datetime, UUID] | None,
+    ) -> Select[tuple[BidVersion]]:
+        stmt = self._select_current_versions().filter(
+            Bid.tender_id == tender_id,
+            Bid.status == BidStatus.PUBLISHED,
         )
-        version = self.session.scalar(stmt)
-        if version is None:
-            raise NoResultFound
-        return version
+        return self._paginate(stmt, limit, offset, after)
 
-    def get_last_version_by_id(self, bid_id: UUID) -> BidVersion:
-        stmt = select(BidVersion).filter(BidVersion.bid_id == bid_id, BidVersion.actual)
-        version = self.session.scalar(stmt)
-        if version is None:
-            raise NoResultFound
-        return version
+    def _select_created_by_employee(
+        self,
+        employee_id: UUID,
+        limit: int,
+        offset: int,
+        after: tuple[datetime, UUID] | None,
+    ) -> Select[tuple[BidVersion]]:
+        stmt = self._select_current_versions().filter(
+            Bid.author_type == BidAuthorType.USER,
+            Bid.author_id == employee_id,
+        )
+        return self._paginate(stmt, limit, offset, after)
+
+    @staticmethod
+    def _version_keys() -> tuple[Any, ...]:
+        """(bid id, version, status), enough to tell if a BidModel changed."""
+        return Bid.id, BidVersion.index, Bid.status
+
+    def _json_rows(
+        self, stmt: Select[tuple[BidVersion]]
+    ) -> Select[tuple[str, datetime, UUID, UUID, int, BidStatus]]:
+        return stmt.with_only_columns(
+            json_object(BidModel, BidVersion.model_columns()),
+            Bid.created_at,
+            Bid.id,
+            *self._version_keys(),
+        )
 
-    def get_published_paginated(
+    async def get_published_paginated(
         self,
         tender_id: UUID,
         limit: int = 5,
         offset: int = 0,
+        after: tuple[datetime, UUID] | None = None,
     ) -> list[BidVersion]:
-        stmt = select(BidVersion).filter(
-            BidVersion.bid.has(status=BidStatus.PUBLISHED),
-            BidVersion.bid.has(tender_id=tender_id),
-        )
-        stmt = stmt.offset(offset).limit(limit)
-        return list(self.session.scalars(stmt))
+        """
+        Published bids of the tender, oldest first. `after` is the (created_at, id)
+        of the last bid on the previous page.
+        """
+        stmt = self._select_published(tender_id, limit, offset, after)
+        return list(await self.session.scalars(stmt))
+
+    async def get_published_paginated_json(
+        self,
+        tender_id: UUID,
+        limit: int = 5,
+        offset: int = 0,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> Sequence[tuple[str, datetime, UUID, UUID, int, BidStatus]]:
+        """
+        The same page as rows of BidModel JSON, created_at and bid id for the
+        cursor, and the version keys.
+        """
+        stmt = self._json_rows(self._select_published(tender_id, limit, offset, after))
+        return (await self.session.execute(stmt)).tuples().all()
+
+    async def get_published_paginated_keys(
+        self,
+        tender_id: UUID,
+        limit: int = 5,
+        offset: int = 0,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> Sequence[tuple[UUID, int, BidStatus]]:
+        """Only the version keys of the same page, to validate an ETag."""
+        stmt = self._select_published(
+            tender_id, limit, offset, after
+        ).with_only_columns(*self._version_keys())
+        return (await self.session.execute(stmt)).tuples().all()
 
-    def get_created_by_employee(
+    async def get_created_by_employee(
         self,
         employee_id: UUID,
         limit: int = 5,
         offset: int = 0,
+        after: tuple[datetime, UUID] | None = None,
     ) -> list[BidVersion]:
-        stmt = (
-            select(BidVersion)
-            .filter(
-                BidVersion.bid.has(
-                    author_id=employee_id, author_type=BidAuthorType.USER
-                )
+        stmt = self._select_created_by_employee(employee_id, limit, offset, after)
+        return list(await self.session.scalars(stmt))
+
+    async def get_created_by_employee_json(
+        self,
+        employee_id: UUID,
+        limit: int = 5,
+        offset: int = 0,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> Sequence[tuple[str, datetime, UUID, UUID, int, BidStatus]]:
+        """The same rows as get_published_paginated_json."""
+        stmt = self._json_rows(
+            self._select_created_by_employee(employee_id, limit, offset, after)
+        )
+        return (await self.session.execute(stmt)).tuples().all()
+
+    async def get_created_by_employee_keys(
+        self,
+        employee_id: UUID,
+        limit: int = 5,
+        offset: int = 0,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> Sequence[tuple[UUID, int, BidStatus]]:
+        """Only the version keys of the same page, to validate an ETag."""
+        stmt = self._select_created_by_employee(
+            employee_id, limit, offset, after
+        ).with_only_columns(*self._version_keys())
+        return (await self.session.execute(stmt)).tuples().all()
+
+    async def search_published(
+        self,
+        tender_id: UUID,
+        text: str,
+        limit: int = 5,
+        offset: int = 0,
+        after: tuple[float, UUID] | None = None,
+    ) -> Sequence[tuple[BidVersion, float]]:
+        """
+        Published bids of the tender matching the search, see
+        TenderRepository.search_public.
+        """
+        search = SearchMatch(text)
+        search_vector = BidVersion.__table__.c.search_vector
+        rank = search.rank(search_vector)
+        stmt = self._select_current_versions().filter(
+            Bid.tender_id == tender_id,
+            Bid.status == BidStatus.PUBLISHED,
+            search.matches(search_vector),
+        )
+        if after is not None:
+            after_rank, after_id = after
+            offset = 0
+            stmt = stmt.filter(
+                tuple_(-rank, BidVersion.id)
+                > tuple_(-cast(after_rank, REAL), literal(after_id, Uuid))
             )
+        ranked: Select[tuple[BidVersion, float]] = (
+            stmt.add_columns(rank)
+            .order_by(rank.desc(), BidVersion.id)
             .offset(offset)
             .limit(limit)
         )
-        return list(self.session.scalars(stmt))
+        return (await self.session.execute(ranked)).tuples().all()
 
-    def has_read_access(
-        self, bid_id: UUID, employee_id: UUID, org_repo: OrganizationRepository
-    ) -> bool:
-        bid = self.find_by_id(bid_id)
-        if bid is None:
-            raise NoResultFound
+    @staticmethod
+    def select_export_json(employee_id: UUID, history: bool) -> Select[tuple[str]]:
+        """
+        BidModel JSON of the bids on the tenders of the employee's organizations,
+        see TenderRepository.select_export_json.
+        """
+        organization_ids = select(OrganizationResponsible.organization_id).where(
+            OrganizationResponsible.user_id == employee_id
+        )
+        versions = (
+            BidVersion.bid_id == Bid.id
+            if history
+            else BidVersion.id == Bid.current_version_id
+        )
+        return (
+            select(json_object(BidModel, BidVersion.model_columns()))
+            .select_from(Bid)
+            .join(BidVersion, versions)
+            .join(Tender, Tender.id == Bid.tender_id)
+            .where(Tender.organization_id.in_(organization_ids))
+        )
 
-        if self.has_write_access(bid_id, employee_id, org_repo):
-            return True
+    async def get_reviews_by_author(
+        self,
+        author_id: UUID,
+        limit: int = 5,
+        offset: int = 0,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> list[BidReview]:
+        """
+        Reviews on the bids the employee authored, oldest first. `after` is the
+        (created_at, id) of the last review on the previous page.
 
-        if bid.status == BidStatus.PUBLISHED:
-            return org_repo.is_responsible(bid.tender.organization_id, employee_id)
+        Every bid of the author contributes at most a page worth of its reviews,
+        read in order from the bid_review index, so only those are sorted however
+        many reviews the bids have.
+        """
+        bids = (
+            select(Bid.id)
+            .where(Bid.author_type == BidAuthorType.USER, Bid.author_id == author_id)
+            .subquery()
+        )
+        per_bid = select(BidReview).where(BidReview.bid_id == bids.c.id)
+        if after is not None:
+            per_bid = per_bid.where(tuple_(BidReview.created_at, BidReview.id) > after)
+            offset = 0
+        reviews = (
+            per_bid.order_by(BidReview.created_at, BidReview.id)
+            .limit(offset + limit)
+            .lateral()
+        )
+        review = aliased(BidReview, reviews)
+        stmt = (
+            select(review)
+            .select_from(bids)
+            .join(reviews, true())
+            .order_by(review.created_at, review.id)
+            .offset(offset)
+            .limit(limit)
+        )
+        return list(await self.session.scalars(stmt))
 
-        return False
+    def _select_model(self, bid_id: UUID) -> Select[Any]:
+        """BidModel fields of the current version, labelled by field name."""
+        return (
+            self._select_current_versions()
+            .filter(Bid.id == bid_id)
+            .with_only_columns(
+                *(
+                    column.label(name)
+                    for name, column in BidVersion.model_columns().items()
+                )
+            )
+        )
 
-    def has_write_access(
-        self, bid_id: UUID, employee_id: UUID, org_repo: OrganizationRepository
-    ) -> bool:
-        bid = self.find_by_id(bid_id)
-        if bid is None:
+    async def update_status(self, bid_id: UUID, status: BidStatus) -> BidModel:
+        # the CTE reads the bid as it was before the update
+        old = self._select_model(bid_id).cte("old")
+        updated = (
+            update(Bid)
+            .where(Bid.id == bid_id)
+            .values(status=status)
+            .returning(Bid.id)
+            .cte("updated")
+        )
+        stmt = select(old).join(updated, updated.c.id == old.c.id)
+        row = (await self.session.execute(stmt)).one_or_none()
+        if row is None:
             raise NoResultFound
+        await self.session.commit()
 
-        if bid.author_type == BidAuthorType.USER:
-            return bid.author_id == employee_id
+        return BidModel.model_validate(row).model_copy(update={"status": status})
 
-        return org_repo.is_responsible(bid.author_id, employee_id)
+    async def _add_version(
+        self,
+        bid_id: UUID,
+        source_index: int | None,
+        changes: dict[str, Any],
+    ) -> BidModel:
+        """See TenderRepository._add_version."""
+        current = aliased(BidVersion)
+        source = current if source_index is None else aliased(BidVersion)
+        fields = {
+            name: func.coalesce(
+                literal(changes.get(name), getattr(source, name).type),
+                getattr(source, name),
+            )
+            for name in ("name", "description")
+        }
+        stmt = (
+            select(
+                Bid.id.label("bid_id"),
+                (current.index + 1).label("version"),
+                *(value.label(name) for name, value in fields.items()),
+                Bid.author_type,
+                Bid.created_at,
+                Bid.status,
+                Bid.tender_id,
+                Bid.author_id,
+            )
+            .join(current, current.id == Bid.current_version_id)
+            .where(Bid.id == bid_id)
+        )
+        if source_index is not None:
+            stmt = stmt.join(
+                source, (source.bid_id == Bid.id) & (source.index == source_index)
+            )
+        new = stmt.cte("new")
 
-    def update_status(self, bid_id: UUID, status: BidStatus) -> None:
-        stmt = update(Bid).where(Bid.id == bid_id).values(status=status)
-        self.session.execute(stmt)
-        self.session.commit()
+        # FOR NO KEY UPDATE: edits of the bid wait for each other, and the next
+        # statement takes its snapshot after the lock is granted, so it sees the
+        # version added by the edit that held it
+        lock = select(Bid.id).where(Bid.id == bid_id).with_for_update(key_share=True)
+        if await self.session.scalar(lock) is None:
+            raise NoResultFound
 
-    def update(
+        version_id = uuid4()
+        inserted = (
+            insert(BidVersion)
+            .from_select(
+                ["id", "bid_id", "index", *fields],
+                select(
+                    literal(version_id, Uuid),
+                    new.c.bid_id,
+                    new.c.version,
+                    *(new.c[name] for name in fields),
+                ),
+            )
+            .returning(BidVersion.bid_id)
+            .cte("inserted")
+        )
+        bumped = (
+            update(Bid)
+            .where(Bid.id == inserted.c.bid_id)
+            .values(current_version_id=version_id)
+            .returning(Bid.id)
+            .cte("bumped")
+        )
+        stmt = select(new).join(bumped, bumped.c.id == new.c.bid_id)
+        row = (await self.session.execute(stmt)).one_or_none()
+        if row is None:
+            raise NoResultFound
+
+        await self.session.commit()
+
+        return BidModel(
+            id=row.bid_id,
+            name=row.name,
+            description=row.description,
+            author_type=row.author_type,
+            created_at=row.created_at,
+            status=row.status,
+            tender_id=row.tender_id,
+            author_id=row.author_id,
+            version=row.version,
+        )
+
+    async def update(
         self,
         bid_id: UUID,
         *,
         name: str | None = None,
         description: str | None = None,
-    ) -> BidVersion:
-        old_version = self.get_last_version_by_id(bid_id)
-        stmt = (
-            update(BidVersion)
-            .where(BidVersion.id == old_version.id)
-            .values(actual=False)
+    ) -> BidModel:
+        changes = {"name": name or None, "description": description or None}
+        return await self._add_version(bid_id, None, changes)
+
+    async def rollback(self, bid_id: UUID, index: int) -> BidModel:
+        """Adds a copy of version `index` as the new current version."""
+        return await self._add_version(bid_id, index, {})
+
+    async def create_review(
+        self, employee_id: UUID, bid_id: UUID, description: str
+    ) -> BidModel:
+        """Adds the review and returns the reviewed bid, in one statement."""
+        review = (
+            insert(BidReview)
+            .values(
+                id=uuid4(),
+                bid_id=bid_id,
+                author_id=employee_id,
+                description=description,
+            )
+            .returning(BidReview.bid_id)
+            .cte("review")
+        )
+        current = self._select_model(bid_id).subquery()
+        stmt = select(current).join(review, review.c.bid_id == current.c.id)
+        row = (await self.session.execute(stmt)).one_or_none()
+        if row is None:
+            raise NoResultFound
+        await self.session.commit()
+
+        return BidModel.model_validate(row)
+
+    async def submit_decision(
+        self,
+        bid_id: UUID,
+        tender: Tender,
+        employee_id: UUID,
+        decision: BidDecisionType,
+    ) -> BidModel:
+        """
+        Records the decision of an employee responsible for the organization of
+        the tender. A rejection closes the bid; the approval that reaches the
+        quorum closes the tender along with its other bids.
+
+        Decisions on the bids of a tender are serialized by a lock on the tender
+        row and every bid keeps the number of its approvals, so a decision
+        counts neither the decisions nor all the responsible employees.
+        """
+        # FOR NO KEY UPDATE, which does not block bids referencing the tender
+        lock = (
+            select(Tender.status)
+            .where(Tender.id == tender.id)
+            .with_for_update(key_share=True)
         )
-        self.session.execute(stmt)
+        tender_status = await self.session.scalar(lock)
+        assert400(tender_status == TenderStatus.PUBLISHED, "tender is closed")
 
-        new_version = BidVersion(
-            bid_id=bid_id,
-            index=old_version.index + 1,
-            name=name or old_version.name,
-            description=description or old_version.description,
+        # a statement after the lock sees every decision committed before it
+        responsible = (
+            select(OrganizationResponsible.user_id)
+            .where(OrganizationResponsible.organization_id == tender.organization_id)
+            .distinct()
+            .limit(MAX_QUORUM)
+            .subquery()
+        )
+        previous = select(BidDecision.decision).where(
+            BidDecision.bid_id == Bid.id, BidDecision.author_id == employee_id
         )
-        self.session.add(new_version)
+        stmt = self._select_model(bid_id).add_columns(
+            previous.scalar_subquery().label("previous"),
+            select(func.count()).select_from(responsible).scalar_subquery(),
+        )
+        row = (await self.session.execute(stmt)).one()
+        *_, previous_decision, quorum = row
+        model = BidModel.model_validate(row)
+        assert400(model.status == BidStatus.PUBLISHED, "bid is not published")
 
-        self.session.commit()
+        if previous_decision == decision:
+            return model
 
-        return new_version
+        recorded = insert(BidDecision).values(
+            id=uuid4(), bid_id=bid_id, author_id=employee_id, decision=decision
+        )
+        decided = recorded.on_conflict_do_update(
+            index_elements=[BidDecision.bid_id, BidDecision.author_id],
+            set_={"decision": recorded.excluded.decision},
+        ).returning(BidDecision.bid_id)
+        if decision == BidDecisionType.REJECTED:
+            # the rejected bid takes no more decisions
+            values: dict[str, Any] = {"status": BidStatus.CLOSED}
+            model = model.model_copy(update={"status": BidStatus.CLOSED})
+        else:
+            values = {"approvals": Bid.approvals + 1}
+        counted = (
+            update(Bid)
+            .where(Bid.id == bid_id)
+            .values(values)
+            .returning(Bid.approvals)
+            .add_cte(decided.cte("decided"))
+        )
+        approvals = (await self.session.execute(counted)).scalar_one()
 
-    def create_review(
-        self, employee_id: UUID, bid_id: UUID, description: str
-    ) -> BidReview:
-        bid_review = BidReview(
-            bid_id=bid_id,
-            author_id=employee_id,
-            description=description,
+        if decision == BidDecisionType.APPROVED and approvals >= quorum:
+            await self._close_tender(tender.id, bid_id)
+        await self.session.commit()
+
+        return model
+
+    async def _close_tender(self, tender_id: UUID, approved_bid_id: UUID) -> None:
+        closed_bids = (
+            update(Bid)
+            .where(
+                Bid.tender_id == tender_id,
+                Bid.id != approved_bid_id,
+                Bid.status != BidStatus.CLOSED,
+            )
+            .values(status=BidStatus.CLOSED)
+            .returning(Bid.id)
+        )
+        service_type = select(TenderVersion.service_type).where(
+            TenderVersion.id == Tender.current_version_id
+        )
+        stmt = (
+            update(Tender)
+            .where(Tender.id == tender_id)
+            .values(status=TenderStatus.CLOSED)
+            .returning(service_type.scalar_subquery())
+            .add_cte(closed_bids.cte("closed_bids"))
+        )
+        closed_service_type = (await self.session.execute(stmt)).scalar_one()
+        if tender_feed is not None:
+            await tender_feed.invalidate(self.session, {closed_service_type})
+        await notify_tender_event(
+            self.session, TenderEventType.CLOSED, tender_id, {closed_service_type}
         )
-        self.session.add(bid_review)
-        self.session.commit()
-        return bid_review
 
 
-def get_bid_repository(
-    session: Annotated[Session, Depends(get_session)],
-) -> Iterator[BidRepository]:
+async def get_bid_repository(
+    session: Annotated[DbSession, Depends(get_session)],
+) -> AsyncIterator[BidRepository]:
     yield BidRepository(session)
@@ -0,0 +1,97 @@
+from collections.abc import AsyncIterator, Sequence
+from typing import Annotated
+
+from fastapi import Depends
+from sqlalchemy import (
+    BigInteger,
+    ColumnElement,
+    Select,
+    Text,
+    func,
+    literal,
+    select,
+    tuple_,
+    union_all,
+)
+
+from avito_sep24.database import DbSession, get_session
+from avito_sep24.models import Bid, BidVersion, Tender, TenderVersion
+from avito_sep24.repositories.rendering import json_object
+from avito_sep24.schemas.bid import BidModel
+from avito_sep24.schemas.tender import TenderModel
+
+
+class ChangeRepository:
+    def __init__(self, session: DbSession) -> None:
+        self.session = session
+
+    @staticmethod
+    def _select_changed(
+        entity: type[Tender | Bid],
+        version: type[TenderVersion | BidVersion],
+        body: ColumnElement[str],
+        limit: int,
+        after: tuple[int, int] | None,
+        xmin: ColumnElement[int],
+    ) -> Select[tuple[str, int, int]]:
+        stmt = (
+            select(body.label("body"), entity.change_xid, entity.change_seq)
+            .join(version, version.id == entity.current_version_id)
+            .where(entity.change_xid < xmin)
+        )
+        if after is not None:
+            stmt = stmt.where(tuple_(entity.change_xid, entity.change_seq) > after)
+        return stmt.order_by(entity.change_xid, entity.change_seq).limit(limit)
+
+    async def get_changes(
+        self, limit: int, after: tuple[int, int] | None = None
+    ) -> Sequence[tuple[str, int, int]]:
+        """
+        Rows of ChangeModel JSON and (change_xid, change_seq) of the tenders and
+        bids changed after `after`, in change order, in one statement. Each
+        table is read from its (change_xid, change_seq) index.
+
+        Sequence values are taken in no particular order by concurrent
+        transactions, so a change is returned only once every transaction
+        older than it has ended: a change that commits later always sorts
+        after the changes returned so far. The feed trails the oldest running
+        transaction.
+        """
+        xmin = (
+            func.pg_snapshot_xmin(func.pg_current_snapshot())
+            .cast(Text)
+            .cast(BigInteger)
+        )
+        tender = json_object(TenderModel, TenderVersion.model_columns())
+        bid = json_object(BidModel, BidVersion.model_columns())
+        pages = [
+            self._select_changed(
+                Tender,
+                TenderVersion,
+                func.concat(literal('{"tender":'), tender, literal(',"bid":null}')),
+                limit,
+                after,
+                xmin,
+            ).subquery(),
+            self._select_changed(
+                Bid,
+                BidVersion,
+                func.concat(literal('{"tender":null,"bid":'), bid, literal("}")),
+                limit,
+                after,
+                xmin,
+            ).subquery(),
+        ]
+        changes = union_all(*(select(page) for page in pages)).subquery()
+        stmt = (
+            select(changes)
+            .order_by(changes.c.change_xid, changes.c.change_seq)
+            .limit(limit)
+        )
+        return (await self.session.execute(stmt)).tuples().all()
+
+
+async def get_change_repository(
+    session: Annotated[DbSession, Depends(get_session)],
+) -> AsyncIterator[ChangeRepository]:
+    yield ChangeRepository(session)
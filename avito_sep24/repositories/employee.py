@@ -1,28 +1,45 @@
 import uuid
-from collections.abc import Iterator
+from collections.abc import AsyncIterator, Collection
 from typing import Annotated
 
 from fastapi import Depends
 from sqlalchemy import select
-from sqlalchemy.orm import Session
 
-from avito_sep24.database import get_session
+from avito_sep24.cache import employee_ids
+from avito_sep24.database import DbSession, get_session
 from avito_sep24.models import Employee
 
 
 class EmployeeRepository:
-    def __init__(self, session: Session) -> None:
+    def __init__(self, session: DbSession) -> None:
         self.session = session
 
-    def find_by_id(self, employee_id: uuid.UUID) -> Employee | None:
-        return self.session.get(Employee, employee_id)
-
-    def find_by_username(self, username: str) -> Employee | None:
-        stmt = select(Employee).where(Employee.username == username)
-        return self.session.scalar(stmt)
-
-
-def get_employee_repository(
-    session: Annotated[Session, Depends(get_session)],
-) -> Iterator[EmployeeRepository]:
+    async def find_by_id(self, employee_id: uuid.UUID) -> Employee | None:
+        return await self.session.get(Employee, employee_id)
+
+    async def find_id_by_username(self, username: str) -> uuid.UUID | None:
+        stmt = select(Employee.id).where(Employee.username == username)
+        return await employee_ids.get_or_load(
+            username, lambda: self.session.scalar(stmt)
+        )
+
+    async def find_ids_by_usernames(
+        self, usernames: Collection[str]
+    ) -> dict[str, uuid.UUID]:
+        """Ids of the known usernames, in one query for bulk requests."""
+        stmt = select(Employee.username, Employee.id).where(
+            Employee.username.in_(usernames)
+        )
+        return dict((await self.session.execute(stmt)).tuples().all())
+
+    async def find_existing_ids(
+        self, employee_ids: Collection[uuid.UUID]
+    ) -> set[uuid.UUID]:
+        stmt = select(Employee.id).where(Employee.id.in_(employee_ids))
+        return set(await self.session.scalars(stmt))
+
+
+async def get_employee_repository(
+    session: Annotated[DbSession, Depends(get_session)],
+) -> AsyncIterator[EmployeeRepository]:
     yield EmployeeRepository(session)
@@ -1,33 +1,74 @@
-from collections.abc import Iterator
+from collections.abc import AsyncIterator, Collection
 from typing import Annotated
 from uuid import UUID
 
 from fastapi import Depends
-from sqlalchemy import exists
-from sqlalchemy.orm import Session
+from sqlalchemy import exists, select, tuple_
 
-from avito_sep24.database import get_session
+from avito_sep24.cache import memberships, responsibles
+from avito_sep24.database import DbSession, get_session
 from avito_sep24.models import Organization, OrganizationResponsible
 
 
 class OrganizationRepository:
-    def __init__(self, session: Session) -> None:
+    def __init__(self, session: DbSession) -> None:
         self.session = session
 
-    def find_by_id(self, organization_id: UUID) -> Organization | None:
-        return self.session.get(Organization, organization_id)
+    async def find_by_id(self, organization_id: UUID) -> Organization | None:
+        return await self.session.get(Organization, organization_id)
 
-    def is_responsible(self, organization_id: UUID, employee_id: UUID) -> bool:
-        stmt = self.session.query(
+    async def is_responsible(self, organization_id: UUID, employee_id: UUID) -> bool:
+        if memberships.loaded:
+            return memberships.contains(organization_id, employee_id)
+
+        stmt = select(
             exists().where(
                 OrganizationResponsible.organization_id == organization_id,
                 OrganizationResponsible.user_id == employee_id,
             )
         )
-        return self.session.scalar(stmt)
+
+        async def load() -> bool:
+            return bool(await self.session.scalar(stmt))
+
+        return await responsibles.get_or_load((organization_id, employee_id), load)
+
+    async def is_responsible_for_any(self, employee_id: UUID) -> bool:
+        stmt = select(exists().where(OrganizationResponsible.user_id == employee_id))
+        return bool(await self.session.scalar(stmt))
+
+    async def find_existing_ids(self, organization_ids: Collection[UUID]) -> set[UUID]:
+        stmt = select(Organization.id).where(Organization.id.in_(organization_ids))
+        return set(await self.session.scalars(stmt))
+
+    async def find_responsible(
+        self, pairs: Collection[tuple[UUID, UUID]]
+    ) -> set[tuple[UUID, UUID]]:
+        """
+        Which of the (organization id, employee id) pairs are memberships, in one
+        query for bulk requests.
+        """
+        if memberships.loaded:
+            return {pair for pair in pairs if memberships.contains(*pair)}
+        if not pairs:
+            return set()
+
+        stmt = (
+            select(
+                OrganizationResponsible.organization_id, OrganizationResponsible.user_id
+            )
+            .where(
+                tuple_(
+                    OrganizationResponsible.organization_id,
+                    OrganizationResponsible.user_id,
+                ).in_(pairs)
+            )
+            .distinct()
+        )
+        return set((await self.session.execute(stmt)).tuples().all())
 
 
-def get_org_repository(
-    session: Annotated[Session, Depends(get_session)],
-) -> Iterator[OrganizationRepository]:
+async def get_org_repository(
+    session: Annotated[DbSession, Depends(get_session)],
+) -> AsyncIterator[OrganizationRepository]:
     yield OrganizationRepository(session)
@@ -0,0 +1,44 @@
+import datetime
+import enum
+import json
+from collections.abc import Mapping
+from typing import Any
+
+from sqlalchemy import ColumnElement, Text, case, func, literal
+from sqlalchemy.orm import QueryableAttribute
+
+from avito_sep24.schemas import BaseSchema
+
+__all__ = ["json_object"]
+
+# utils.format_datetime in to_char terms
+_DATETIME_FORMAT = 'YYYY-MM-DD"T"HH24:MI:SS"Z00:00"'
+
+
+def _field_json(
+    column: ColumnElement[Any] | QueryableAttribute[Any], annotation: type[Any] | None
+) -> ColumnElement[str]:
+    if isinstance(annotation, type) and issubclass(annotation, enum.Enum):
+        # enums are stored by name and serialized by value
+        column = case(*((column == member, member.value) for member in annotation))
+    elif annotation is datetime.datetime:
+        column = func.to_char(column, _DATETIME_FORMAT)
+    return func.coalesce(func.to_json(column).cast(Text), "null")
+
+
+def json_object(
+    schema: type[BaseSchema],
+    columns: Mapping[str, ColumnElement[Any] | QueryableAttribute[Any]],
+) -> ColumnElement[str]:
+    """
+    Text of the JSON object Postgres builds from `columns` (by field name),
+    byte for byte what `schema` serializes to: the same key order and aliases,
+    enum values and datetime format, and compact separators.
+    """
+    parts: list[ColumnElement[str]] = []
+    for name, field in schema.model_fields.items():
+        key = json.dumps(field.alias or name, ensure_ascii=False)
+        parts.append(literal(("{" if not parts else ",") + key + ":"))
+        parts.append(_field_json(columns[name], field.annotation))
+    parts.append(literal("}"))
+    return func.concat(*parts)
@@ -0,0 +1,35 @@
+from functools import reduce
+from typing import Any
+
+from sqlalchemy import REAL, ColumnElement, cast, func
+from sqlalchemy.dialects.postgresql import REGCONFIG, TSQUERY
+
+from avito_sep24.models.search import SEARCH_CONFIGS
+
+__all__ = ["SearchMatch"]
+
+
+def _either(left: ColumnElement[Any], right: ColumnElement[Any]) -> ColumnElement[Any]:
+    return left.op("||", return_type=TSQUERY)(right)
+
+
+class SearchMatch:
+    """
+    Matches a web search style query (quoted phrases, "or", "-" to exclude) in
+    any of the configurations the versions are indexed with, see
+    models.search.search_document.
+    """
+
+    def __init__(self, text: str) -> None:
+        queries: list[ColumnElement[Any]] = [
+            func.websearch_to_tsquery(cast(config, REGCONFIG), text)
+            for config in SEARCH_CONFIGS
+        ]
+        self._query = reduce(_either, queries)
+
+    def matches(self, vector: ColumnElement[str]) -> ColumnElement[bool]:
+        """Served by the GIN index on the column."""
+        return vector.bool_op("@@")(self._query)
+
+    def rank(self, vector: ColumnElement[str]) -> ColumnElement[float]:
+        return func.ts_rank(vector, self._query, type_=REAL)
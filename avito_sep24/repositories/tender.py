@@ -1,35 +1,104 @@
-from collections.abc import Iterator
-from typing import Annotated
-from uuid import UUID
+from collections.abc import AsyncIterator, Collection, Sequence
+from typing import Annotated, Any, NamedTuple
+from uuid import UUID, uuid4
 
 from fastapi import Depends
-from sqlalchemy import select, update
+from sqlalchemy import (
+    REAL,
+    Select,
+    Uuid,
+    cast,
+    func,
+    literal,
+    select,
+    true,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import NoResultFound
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import aliased, contains_eager
 
-from avito_sep24.database import get_session
-from avito_sep24.models import Tender, TenderVersion
-from avito_sep24.repositories.organization import OrganizationRepository
-from avito_sep24.schemas.tender import TenderServiceType, TenderStatus
+from avito_sep24.cache import NOTIFY_CHANNEL, tender_feed
+from avito_sep24.database import DbSession, get_session
+from avito_sep24.env import TENDER_EVENTS
+from avito_sep24.events import TenderEventType
+from avito_sep24.models import OrganizationResponsible, Tender, TenderVersion
+from avito_sep24.repositories.rendering import json_object
+from avito_sep24.repositories.search import SearchMatch
+from avito_sep24.schemas.tender import TenderModel, TenderServiceType, TenderStatus
+
+
+class NewTender(NamedTuple):
+    name: str
+    description: str
+    service_type: TenderServiceType
+    organization_id: UUID
+    creator_id: UUID
+
+
+async def notify_tender_event(
+    session: DbSession,
+    event_type: TenderEventType,
+    tender_id: UUID,
+    service_types: set[TenderServiceType],
+) -> None:
+    """
+    Before the commit of a change to a published tender: sends the tender as it
+    is after the change to the event streams of all instances, see
+    events.TenderEventBroker. NOTIFY delivers it on commit, so streams never see
+    a change that is rolled back.
+    """
+    if not TENDER_EVENTS:
+        return
+    prefix = f"tender_event:{event_type.value}:" + ",".join(
+        t.name for t in service_types
+    )
+    payload = literal(prefix + ":") + json_object(
+        TenderModel, TenderVersion.model_columns()
+    )
+    stmt = (
+        select(func.pg_notify(NOTIFY_CHANNEL, payload))
+        .select_from(Tender)
+        .join(TenderVersion, TenderVersion.id == Tender.current_version_id)
+        .where(Tender.id == tender_id)
+    )
+    await session.execute(stmt)
 
 
 class TenderRepository:
-    def __init__(self, session: Session) -> None:
+    def __init__(self, session: DbSession) -> None:
         self.session = session
 
-    def create_as_version(
-        self,
+    @staticmethod
+    def _select_current_versions() -> Select[tuple[TenderVersion]]:
+        return (
+            select(TenderVersion)
+            .join(Tender, Tender.current_version_id == TenderVersion.id)
+            .options(contains_eager(TenderVersion.tender))
+        )
+
+    @staticmethod
+    def _version_keys() -> tuple[Any, ...]:
+        """(tender id, version, status), enough to tell if a TenderModel changed."""
+        return Tender.id, TenderVersion.index, Tender.status
+
+    @staticmethod
+    def _new_version(
         name: str,
         description: str,
         service_type: TenderServiceType,
         organization_id: UUID,
         creator_id: UUID,
     ) -> TenderVersion:
+        version_id = uuid4()
         tender = Tender(
             organization_id=organization_id,
             creator_id=creator_id,
+            current_version_id=version_id,
         )
-        tender_version = TenderVersion(
+        return TenderVersion(
+            id=version_id,
             tender=tender,
             name=name,
             description=description,
@@ -37,118 +106,437 @@ class TenderRepository:
             index=1,
         )
 
-        self.session.add(tender)
-        self.session.add(tender_version)
-        self.session.commit()
+    async def create_as_version(
+        self,
+        name: str,
+        description: str,
+        service_type: TenderServiceType,
+        organization_id: UUID,
+        creator_id: UUID,
+    ) -> TenderModel:
+        """Inserts the tender and its first version in one statement."""
+        tender_id, version_id = uuid4(), uuid4()
+        tender = (
+            insert(Tender)
+            .values(
+                id=tender_id,
+                status=TenderStatus.CREATED,
+                organization_id=organization_id,
+                creator_id=creator_id,
+                current_version_id=version_id,
+            )
+            .returning(Tender.status, Tender.created_at)
+            .cte("tender")
+        )
+        version = (
+            insert(TenderVersion)
+            .values(
+                id=version_id,
+                tender_id=tender_id,
+                name=name,
+                description=description,
+                service_type=service_type,
+                index=1,
+            )
+            .returning(TenderVersion.index)
+            .cte("version")
+        )
+        # both are single rows
+        stmt = select(tender, version).join_from(tender, version, true())
+        row = (await self.session.execute(stmt)).one()
+        await self.session.commit()
 
-        return tender_version
+        return TenderModel(
+            id=tender_id,
+            name=name,
+            description=description,
+            service_type=service_type,
+            status=row.status,
+            version=row.index,
+            created_at=row.created_at,
+            organization_id=organization_id,
+        )
 
-    def find_by_id(self, tender_id: UUID) -> Tender | None:
-        return self.session.get(Tender, tender_id)
+    async def create_many_as_versions(
+        self, tenders: Sequence[NewTender]
+    ) -> list[TenderVersion]:
+        """
+        Same as create_as_version for every tender, in one transaction. The flush
+        sends tenders and versions with one multi-row INSERT per table (per
+        batch of insertmanyvalues).
+        """
+        tender_versions = [
+            self._new_version(
+                tender.name,
+                tender.description,
+                tender.service_type,
+                tender.organization_id,
+                tender.creator_id,
+            )
+            for tender in tenders
+        ]
 
-    def get_version_by_id(self, tender_id: UUID, index: int) -> TenderVersion:
-        stmt = select(TenderVersion).filter(
-            TenderVersion.tender_id == tender_id, TenderVersion.index == index
-        )
-        version = self.session.scalar(stmt)
-        if version is None:
-            raise NoResultFound
-        return version
+        self.session.add_all([version.tender for version in tender_versions])
+        self.session.add_all(tender_versions)
+        await self.session.commit()
+
+        return tender_versions
+
+    async def find_by_id(self, tender_id: UUID) -> Tender | None:
+        return await self.session.get(Tender, tender_id)
 
-    def get_last_version_by_id(self, tender_id: UUID) -> TenderVersion:
-        stmt = select(TenderVersion).filter(
-            TenderVersion.tender_id == tender_id, TenderVersion.actual
+    async def find_statuses(
+        self, tender_ids: Collection[UUID]
+    ) -> dict[UUID, TenderStatus]:
+        """Statuses of the existing tenders, in one query for bulk requests."""
+        stmt = select(Tender.id, Tender.status).where(Tender.id.in_(tender_ids))
+        return dict((await self.session.execute(stmt)).tuples().all())
+
+    def _select_public_page(
+        self,
+        limit: int,
+        offset: int,
+        service_types: list[TenderServiceType] | None,
+        after: tuple[str, UUID] | None,
+    ) -> Select[tuple[TenderVersion]]:
+        stmt = self._select_current_versions().filter(
+            Tender.status == TenderStatus.PUBLISHED
+        )
+        if service_types:
+            stmt = stmt.filter(TenderVersion.service_type.in_(service_types))
+        if after is not None:
+            # the cursor is passed instead of the offset, not on top of it
+            stmt = stmt.filter(tuple_(TenderVersion.name, TenderVersion.id) > after)
+            offset = 0
+        return (
+            stmt.order_by(TenderVersion.name, TenderVersion.id)
+            .offset(offset)
+            .limit(limit)
         )
-        version = self.session.scalar(stmt)
-        if version is None:
-            raise NoResultFound
-        return version
 
-    def get_public_paginated(
+    async def get_public_paginated(
         self,
         limit: int = 5,
         offset: int = 0,
         service_types: list[TenderServiceType] | None = None,
+        after: tuple[str, UUID] | None = None,
     ) -> list[TenderVersion]:
-        stmt = select(TenderVersion).filter(
-            TenderVersion.tender.has(status=TenderStatus.PUBLISHED)
+        """
+        Published tenders ordered by name. `after` is the (name, version id) of
+        the last tender on the previous page, `offset` is ignored with it; unlike
+        `offset`, it lets the index on (name, id) start right at the requested
+        page.
+        """
+        stmt = self._select_public_page(limit, offset, service_types, after)
+        return list(await self.session.scalars(stmt))
+
+    async def get_public_paginated_json(
+        self,
+        limit: int = 5,
+        offset: int = 0,
+        service_types: list[TenderServiceType] | None = None,
+        after: tuple[str, UUID] | None = None,
+    ) -> Sequence[tuple[str, str, UUID, UUID, int, TenderStatus]]:
+        """
+        The same page as rows of TenderModel JSON, name and version id for the
+        cursor, and the version keys.
+        """
+        stmt = self._select_public_page(
+            limit, offset, service_types, after
+        ).with_only_columns(
+            json_object(TenderModel, TenderVersion.model_columns()),
+            TenderVersion.name,
+            TenderVersion.id,
+            *self._version_keys(),
+        )
+        return (await self.session.execute(stmt)).tuples().all()
+
+    async def get_public_paginated_keys(
+        self,
+        limit: int = 5,
+        offset: int = 0,
+        service_types: list[TenderServiceType] | None = None,
+        after: tuple[str, UUID] | None = None,
+    ) -> Sequence[tuple[UUID, int, TenderStatus]]:
+        """Only the version keys of the same page, to validate an ETag."""
+        stmt = self._select_public_page(
+            limit, offset, service_types, after
+        ).with_only_columns(*self._version_keys())
+        return (await self.session.execute(stmt)).tuples().all()
+
+    async def search_public(
+        self,
+        text: str,
+        limit: int = 5,
+        offset: int = 0,
+        service_types: list[TenderServiceType] | None = None,
+        after: tuple[float, UUID] | None = None,
+    ) -> Sequence[tuple[TenderVersion, float]]:
+        """
+        Published tenders matching the search, with their ranks, best first.
+        `after` is the (rank, version id) of the last tender on the previous page.
+        """
+        search = SearchMatch(text)
+        search_vector = TenderVersion.__table__.c.search_vector
+        rank = search.rank(search_vector)
+        stmt = self._select_current_versions().filter(
+            Tender.status == TenderStatus.PUBLISHED,
+            search.matches(search_vector),
         )
-        if service_types is not None:
+        if service_types:
             stmt = stmt.filter(TenderVersion.service_type.in_(service_types))
-        stmt = stmt.offset(offset).limit(limit)
-        return list(self.session.scalars(stmt))
+        if after is not None:
+            after_rank, after_id = after
+            offset = 0
+            stmt = stmt.filter(
+                tuple_(-rank, TenderVersion.id)
+                > tuple_(-cast(after_rank, REAL), literal(after_id, Uuid))
+            )
+        ranked: Select[tuple[TenderVersion, float]] = (
+            stmt.add_columns(rank)
+            .order_by(rank.desc(), TenderVersion.id)
+            .offset(offset)
+            .limit(limit)
+        )
+        return (await self.session.execute(ranked)).tuples().all()
+
+    @staticmethod
+    def select_export_json(employee_id: UUID, history: bool) -> Select[tuple[str]]:
+        """
+        TenderModel JSON of the current versions, or of all versions if
+        `history`, of the tenders of the employee's organizations. Unordered,
+        so Postgres can stream it straight from a scan; see
+        database.stream_partitions.
+        """
+        organization_ids = select(OrganizationResponsible.organization_id).where(
+            OrganizationResponsible.user_id == employee_id
+        )
+        versions = (
+            TenderVersion.tender_id == Tender.id
+            if history
+            else TenderVersion.id == Tender.current_version_id
+        )
+        return (
+            select(json_object(TenderModel, TenderVersion.model_columns()))
+            .select_from(Tender)
+            .join(TenderVersion, versions)
+            .where(Tender.organization_id.in_(organization_ids))
+        )
+
+    def _select_created_by_employee(
+        self, employee_id: UUID, limit: int, offset: int
+    ) -> Select[tuple[TenderVersion]]:
+        return (
+            self._select_current_versions()
+            .filter(Tender.creator_id == employee_id)
+            .offset(offset)
+            .limit(limit)
+        )
 
-    def get_created_by_employee(
+    async def get_created_by_employee(
         self,
         employee_id: UUID,
         limit: int = 5,
         offset: int = 0,
     ) -> list[TenderVersion]:
-        stmt = (
-            select(TenderVersion)
-            .filter(TenderVersion.tender.has(creator_id=employee_id))
-            .offset(offset)
-            .limit(limit)
+        stmt = self._select_created_by_employee(employee_id, limit, offset)
+        return list(await self.session.scalars(stmt))
+
+    async def get_created_by_employee_json(
+        self,
+        employee_id: UUID,
+        limit: int = 5,
+        offset: int = 0,
+    ) -> Sequence[tuple[str, UUID, int, TenderStatus]]:
+        """The same page as rows of TenderModel JSON and the version keys."""
+        stmt = self._select_created_by_employee(
+            employee_id, limit, offset
+        ).with_only_columns(
+            json_object(TenderModel, TenderVersion.model_columns()),
+            *self._version_keys(),
         )
-        return list(self.session.scalars(stmt))
+        return (await self.session.execute(stmt)).tuples().all()
 
-    def has_read_access(
-        self, tender_id: UUID, employee_id: UUID, org_repo: OrganizationRepository
-    ) -> bool:
-        tender = self.find_by_id(tender_id)
-        if tender is None:
-            raise NoResultFound
+    async def get_created_by_employee_keys(
+        self,
+        employee_id: UUID,
+        limit: int = 5,
+        offset: int = 0,
+    ) -> Sequence[tuple[UUID, int, TenderStatus]]:
+        """Only the version keys of the same page, to validate an ETag."""
+        stmt = self._select_created_by_employee(
+            employee_id, limit, offset
+        ).with_only_columns(*self._version_keys())
+        return (await self.session.execute(stmt)).tuples().all()
 
-        if tender.status == TenderStatus.PUBLISHED:
-            return True
+    async def _invalidate_feed(self, service_types: set[TenderServiceType]) -> None:
+        """Before the commit of a change to a published tender."""
+        if tender_feed is not None:
+            await tender_feed.invalidate(self.session, service_types)
 
-        return org_repo.is_responsible(tender.organization_id, employee_id)
+    def _select_model(self, tender_id: UUID) -> Select[Any]:
+        """TenderModel fields of the current version, labelled by field name."""
+        return (
+            self._select_current_versions()
+            .filter(Tender.id == tender_id)
+            .with_only_columns(
+                *(
+                    column.label(name)
+                    for name, column in TenderVersion.model_columns().items()
+                )
+            )
+        )
 
-    def has_write_access(
-        self, tender_id: UUID, employee_id: UUID, org_repo: OrganizationRepository
-    ) -> bool:
-        tender = self.find_by_id(tender_id)
-        if tender is None:
+    async def update_status(self, tender_id: UUID, status: TenderStatus) -> TenderModel:
+        # the CTE reads the tender as it was before the update
+        old = self._select_model(tender_id).cte("old")
+        updated = (
+            update(Tender)
+            .where(Tender.id == tender_id)
+            .values(status=status)
+            .returning(Tender.id)
+            .cte("updated")
+        )
+        stmt = select(old).join(updated, updated.c.id == old.c.id)
+        row = (await self.session.execute(stmt)).one_or_none()
+        if row is None:
             raise NoResultFound
 
-        return org_repo.is_responsible(tender.organization_id, employee_id)
+        published = TenderStatus.PUBLISHED
+        if row.status != status and published in (row.status, status):
+            await self._invalidate_feed({row.service_type})
+            await notify_tender_event(
+                self.session,
+                TenderEventType.PUBLISHED
+                if status == published
+                else TenderEventType.CLOSED,
+                tender_id,
+                {row.service_type},
+            )
+        await self.session.commit()
 
-    def update_status(self, tender_id: UUID, status: TenderStatus) -> None:
-        stmt = update(Tender).where(Tender.id == tender_id).values(status=status)
-        self.session.execute(stmt)
-        self.session.commit()
+        return TenderModel.model_validate(row).model_copy(update={"status": status})
 
-    def update(
+    async def _add_version(
         self,
         tender_id: UUID,
-        *,
-        name: str | None = None,
-        description: str | None = None,
-        service_type: TenderServiceType | None = None,
-    ) -> TenderVersion:
-        old_version = self.get_last_version_by_id(tender_id)
+        source_index: int | None,
+        changes: dict[str, Any],
+    ) -> TenderModel:
+        """
+        Adds a version made of the fields of version `source_index` (the current
+        one if None) and `changes`, and makes it current, in one statement after
+        locking the tender row. Concurrent edits and rollbacks of the tender run
+        one after another, so versions stay contiguous and no edit is lost or
+        fails.
+        """
+        current = aliased(TenderVersion)
+        source = current if source_index is None else aliased(TenderVersion)
+        fields = {
+            name: func.coalesce(
+                literal(changes.get(name), getattr(source, name).type),
+                getattr(source, name),
+            )
+            for name in ("name", "description", "service_type")
+        }
         stmt = (
-            update(TenderVersion)
-            .where(TenderVersion.id == old_version.id)
-            .values(actual=False)
+            select(
+                Tender.id.label("tender_id"),
+                (current.index + 1).label("version"),
+                *(value.label(name) for name, value in fields.items()),
+                current.service_type.label("old_service_type"),
+                Tender.status,
+                Tender.created_at,
+                Tender.organization_id,
+            )
+            .join(current, current.id == Tender.current_version_id)
+            .where(Tender.id == tender_id)
+        )
+        if source_index is not None:
+            stmt = stmt.join(
+                source,
+                (source.tender_id == Tender.id) & (source.index == source_index),
+            )
+        new = stmt.cte("new")
+
+        # FOR NO KEY UPDATE: edits of the tender wait for each other, and the next
+        # statement takes its snapshot after the lock is granted, so it sees the
+        # version added by the edit that held it
+        lock = (
+            select(Tender.id)
+            .where(Tender.id == tender_id)
+            .with_for_update(key_share=True)
         )
-        self.session.execute(stmt)
+        if await self.session.scalar(lock) is None:
+            raise NoResultFound
+
+        version_id = uuid4()
+        inserted = (
+            insert(TenderVersion)
+            .from_select(
+                ["id", "tender_id", "index", *fields],
+                select(
+                    literal(version_id, Uuid),
+                    new.c.tender_id,
+                    new.c.version,
+                    *(new.c[name] for name in fields),
+                ),
+            )
+            .returning(TenderVersion.tender_id)
+            .cte("inserted")
+        )
+        bumped = (
+            update(Tender)
+            .where(Tender.id == inserted.c.tender_id)
+            .values(current_version_id=version_id)
+            .returning(Tender.id)
+            .cte("bumped")
+        )
+        stmt = select(new).join(bumped, bumped.c.id == new.c.tender_id)
+        row = (await self.session.execute(stmt)).one_or_none()
+        if row is None:
+            raise NoResultFound
+
+        if row.status == TenderStatus.PUBLISHED:
+            service_types = {row.old_service_type, row.service_type}
+            await self._invalidate_feed(service_types)
+            await notify_tender_event(
+                self.session, TenderEventType.EDITED, tender_id, service_types
+            )
+        await self.session.commit()
 
-        new_version = TenderVersion(
-            tender_id=tender_id,
-            index=old_version.index + 1,
-            name=name or old_version.name,
-            description=description or old_version.description,
-            service_type=service_type or old_version.service_type,
+        return TenderModel(
+            id=row.tender_id,
+            name=row.name,
+            description=row.description,
+            service_type=row.service_type,
+            status=row.status,
+            version=row.version,
+            created_at=row.created_at,
+            organization_id=row.organization_id,
         )
-        self.session.add(new_version)
 
-        self.session.commit()
+    async def update(
+        self,
+        tender_id: UUID,
+        *,
+        name: str | None = None,
+        description: str | None = None,
+        service_type: TenderServiceType | None = None,
+    ) -> TenderModel:
+        changes = {
+            "name": name or None,
+            "description": description or None,
+            "service_type": service_type,
+        }
+        return await self._add_version(tender_id, None, changes)
 
-        return new_version
+    async def rollback(self, tender_id: UUID, index: int) -> TenderModel:
+        """Adds a copy of version `index` as the new current version."""
+        return await self._add_version(tender_id, index, {})
 
 
-def get_tender_repository(
-    session: Annotated[Session, Depends(get_session)],
-) -> Iterator[TenderRepository]:
+async def get_tender_repository(
+    session: Annotated[DbSession, Depends(get_session)],
+) -> AsyncIterator[TenderRepository]:
     yield TenderRepository(session)
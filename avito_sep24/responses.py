@@ -0,0 +1,62 @@
+from typing import Generic, TypeVar
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from avito_sep24.schemas import BaseSchema
+from avito_sep24.schemas.bid import BidModel, BidReviewModel
+from avito_sep24.schemas.change import ChangeModel
+from avito_sep24.schemas.tender import TenderModel
+
+__all__ = [
+    "JSONListRenderer",
+    "tender_list",
+    "bid_list",
+    "bid_review_list",
+    "change_list",
+]
+
+SchemaT = TypeVar("SchemaT", bound=BaseSchema)
+
+
+class JSONListRenderer(Generic[SchemaT]):
+    """
+    Serializes lists of schemas straight to JSON bytes with a serializer compiled
+    once, instead of FastAPI's response validation, dump to Python objects and
+    json.dumps. The bytes are identical to what FastAPI would send. Routes using
+    it declare `response_model` in the decorator, for the OpenAPI schema.
+    """
+
+    def __init__(self, schema: type[SchemaT]) -> None:
+        # list[schema] is built at runtime from the class, which mypy only
+        # accepts as a type when it is spelled out statically
+        self._adapter: TypeAdapter[list[SchemaT]] = TypeAdapter(
+            list[schema]  # type: ignore[valid-type]
+        )
+
+    @staticmethod
+    def respond(body: bytes, response: Response) -> Response:
+        """`response` is the one injected into the route, its headers are kept."""
+        rendered = Response(body, media_type="application/json")
+        rendered.raw_headers.extend(response.raw_headers)
+        return rendered
+
+    def dump(self, models: list[SchemaT]) -> bytes:
+        return self._adapter.dump_json(models, by_alias=True)
+
+    @staticmethod
+    def dump_objects(objects: list[str]) -> bytes:
+        """Same for objects already serialized, see repositories.rendering."""
+        return ("[" + ",".join(objects) + "]").encode()
+
+    def render(self, models: list[SchemaT], response: Response) -> Response:
+        return self.respond(self.dump(models), response)
+
+    def render_objects(self, objects: list[str], response: Response) -> Response:
+        return self.respond(self.dump_objects(objects), response)
+
+
+tender_list = JSONListRenderer(TenderModel)
+bid_list = JSONListRenderer(BidModel)
+bid_review_list = JSONListRenderer(BidReviewModel)
+change_list = JSONListRenderer(ChangeModel)
@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+
+from . import create, read, update
+
+__all__ = ["router"]
+
+router = APIRouter()
+router.include_router(create.router)
+router.include_router(read.router)
+router.include_router(update.router)
@@ -1,10 +1,16 @@
 import uuid
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 
 from avito_sep24.errors import ClientRequestError, assert401, assert403, assert404
-from avito_sep24.repositories.bid import BidRepository, get_bid_repository
+from avito_sep24.etags import model_tag
+from avito_sep24.repositories.access import (
+    AccessRepository,
+    BidPolicy,
+    get_access_repository,
+)
+from avito_sep24.repositories.bid import BidRepository, NewBid, get_bid_repository
 from avito_sep24.repositories.employee import (
     EmployeeRepository,
     get_employee_repository,
@@ -14,26 +20,35 @@ from avito_sep24.repositories.organization import (
     get_org_repository,
 )
 from avito_sep24.repositories.tender import TenderRepository, get_tender_repository
-from avito_sep24.schemas.bid import BidAuthorType, BidCreateModel, BidFeedback, BidModel
+from avito_sep24.schemas.bid import (
+    BidAuthorType,
+    BidBulkCreateItems,
+    BidBulkResultModel,
+    BidCreateModel,
+    BidFeedback,
+    BidModel,
+)
 from avito_sep24.schemas.tender import TenderStatus
+from avito_sep24.utils import parse_uuid
 
 router = APIRouter()
 
 
 @router.post("/api/bids/new")
-def create_new_bid(
+async def create_new_bid(
     model: BidCreateModel,
     tender_repo: Annotated[TenderRepository, Depends(get_tender_repository)],
     employee_repo: Annotated[EmployeeRepository, Depends(get_employee_repository)],
     org_repo: Annotated[OrganizationRepository, Depends(get_org_repository)],
     bid_repo: Annotated[BidRepository, Depends(get_bid_repository)],
+    response: Response,
 ) -> BidModel:
     try:
         tender_id = uuid.UUID(model.tender_id)
     except ValueError as e:
         raise ClientRequestError(404, "tender id invalid") from e
 
-    tender = tender_repo.find_by_id(tender_id)
+    tender = await tender_repo.find_by_id(tender_id)
     assert404(tender is not None, "tender not found")
 
     assert403(tender.status == TenderStatus.PUBLISHED, "you can't bid to this tender")
@@ -44,53 +59,116 @@ def create_new_bid(
         raise ClientRequestError(401, "author id invalid") from e
 
     if model.author_type == BidAuthorType.USER:
-        author = employee_repo.find_by_id(author_id)
+        author = await employee_repo.find_by_id(author_id)
         assert401(author is not None, "no such employee")
     else:
-        author = org_repo.find_by_id(author_id)
+        author = await org_repo.find_by_id(author_id)
         assert401(author is not None, "no such organization")
 
-    bid_version = bid_repo.create_as_version(
+    bid = await bid_repo.create_as_version(
         name=model.name,
         description=model.description,
         tender_id=tender_id,
         author_type=model.author_type,
         author_id=author_id,
     )
-    return bid_version.as_model()
+    response.headers["ETag"] = model_tag(bid)
+    return bid
 
 
-@router.put("/api/bids/{bid_id}/feedback")
-def create_bid_review(
+@router.post("/api/bids/bulk")
+async def create_new_bids(
+    models: BidBulkCreateItems,
+    tender_repo: Annotated[TenderRepository, Depends(get_tender_repository)],
     employee_repo: Annotated[EmployeeRepository, Depends(get_employee_repository)],
     org_repo: Annotated[OrganizationRepository, Depends(get_org_repository)],
     bid_repo: Annotated[BidRepository, Depends(get_bid_repository)],
-    tender_repo: Annotated[TenderRepository, Depends(get_tender_repository)],
+) -> list[BidBulkResultModel]:
+    """
+    Creates every bid that /api/bids/new would, in one transaction, with a query
+    per kind of check rather than per item.
+    """
+    tender_ids = [parse_uuid(model.tender_id) for model in models]
+    author_ids = [parse_uuid(model.author_id) for model in models]
+    tender_statuses = await tender_repo.find_statuses(
+        {tender_id for tender_id in tender_ids if tender_id}
+    )
+
+    def author_ids_of(author_type: BidAuthorType) -> set[uuid.UUID]:
+        return {
+            author_id
+            for model, author_id in zip(models, author_ids, strict=True)
+            if author_id and model.author_type == author_type
+        }
+
+    existing_authors = {
+        BidAuthorType.USER: await employee_repo.find_existing_ids(
+            author_ids_of(BidAuthorType.USER)
+        ),
+        BidAuthorType.ORGANIZATION: await org_repo.find_existing_ids(
+            author_ids_of(BidAuthorType.ORGANIZATION)
+        ),
+    }
+
+    results: list[BidBulkResultModel | None] = []
+    new_bids: list[NewBid] = []
+    for model, tender_id, author_id in zip(models, tender_ids, author_ids, strict=True):
+        try:
+            assert404(tender_id is not None, "tender id invalid")
+            assert404(tender_id in tender_statuses, "tender not found")
+            assert403(
+                tender_statuses[tender_id] == TenderStatus.PUBLISHED,
+                "you can't bid to this tender",
+            )
+            assert401(author_id is not None, "author id invalid")
+            assert401(
+                author_id in existing_authors[model.author_type],
+                "no such employee"
+                if model.author_type == BidAuthorType.USER
+                else "no such organization",
+            )
+        except ClientRequestError as e:
+            results.append(
+                BidBulkResultModel(status_code=e.status_code, reason=e.reason)
+            )
+            continue
+
+        assert tender_id is not None and author_id is not None
+        results.append(None)
+        new_bids.append(
+            NewBid(
+                name=model.name,
+                description=model.description,
+                tender_id=tender_id,
+                author_type=model.author_type,
+                author_id=author_id,
+            )
+        )
+
+    created = iter(await bid_repo.create_many_as_versions(new_bids))
+    return [
+        result or BidBulkResultModel(status_code=200, bid=next(created).as_model())
+        for result in results
+    ]
+
+
+@router.put("/api/bids/{bid_id}/feedback")
+async def create_bid_review(
+    access_repo: Annotated[AccessRepository, Depends(get_access_repository)],
+    bid_repo: Annotated[BidRepository, Depends(get_bid_repository)],
+    response: Response,
     bid_id: str,
     bidFeedback: BidFeedback,  # noqa
     username: str,
 ) -> BidModel:
-    employee = employee_repo.find_by_username(username)
-    assert401(employee is not None, "no employee found with such username")
-
-    try:
-        bid_uuid = uuid.UUID(bid_id)
-    except ValueError as e:
-        raise ClientRequestError(404, "invalid bid_id") from e
-
-    bid = bid_repo.find_by_id(bid_uuid)
-    assert404(bid is not None, "no such bid found")
-
-    has_access = tender_repo.has_write_access(
-        bid.tender.id,
-        employee.id,
-        org_repo,
-    )
-    assert403(has_access)
+    access = await access_repo.check_bid(parse_uuid(bid_id), username, BidPolicy.REVIEW)
+    bid = access.allowed_entity("no such bid found")
+    assert access.employee_id is not None
 
-    bid_repo.create_review(
-        employee_id=employee.id,
+    model = await bid_repo.create_review(
+        employee_id=access.employee_id,
         bid_id=bid.id,
         description=bidFeedback,
     )
-    return bid_repo.get_last_version_by_id(bid.id).as_model()
+    response.headers["ETag"] = model_tag(model)
+    return model
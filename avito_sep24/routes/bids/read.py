@@ -1,113 +1,251 @@
 import uuid
+from collections.abc import Sequence
+from datetime import datetime
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
 
-from avito_sep24.errors import ClientRequestError, assert401, assert403, assert404
+from avito_sep24.env import POSTGRES_RENDER_JSON
+from avito_sep24.errors import ClientRequestError, assert401
+from avito_sep24.etags import (
+    IfNoneMatch,
+    entity_tag,
+    is_not_modified,
+    models_tag,
+    not_modified,
+)
+from avito_sep24.repositories.access import (
+    AccessRepository,
+    BidPolicy,
+    TenderPolicy,
+    get_access_repository,
+)
 from avito_sep24.repositories.bid import BidRepository, get_bid_repository
 from avito_sep24.repositories.employee import (
     EmployeeRepository,
     get_employee_repository,
 )
-from avito_sep24.repositories.organization import (
-    OrganizationRepository,
-    get_org_repository,
+from avito_sep24.responses import bid_list, bid_review_list
+from avito_sep24.schemas.bid import BidModel, BidReviewModel, BidStatus
+from avito_sep24.schemas.pagination import (
+    NEXT_CURSOR_HEADER,
+    PaginationCursor,
+    PaginationLimit,
+    PaginationOffset,
+    decode_cursor,
+    encode_cursor,
 )
-from avito_sep24.repositories.tender import TenderRepository, get_tender_repository
-from avito_sep24.schemas.bid import BidModel, BidStatus
-from avito_sep24.schemas.pagination import PaginationLimit, PaginationOffset
+from avito_sep24.schemas.search import (
+    SearchText,
+    decode_search_cursor,
+    encode_search_cursor,
+)
+from avito_sep24.utils import parse_uuid
 
 router = APIRouter()
 
 
-@router.get("/api/bids/{tender_id}/list")
-def get_bids_for_tender(
-    tender_repo: Annotated[TenderRepository, Depends(get_tender_repository)],
-    employee_repo: Annotated[EmployeeRepository, Depends(get_employee_repository)],
+def _parse_cursor(cursor: str | None) -> tuple[datetime, uuid.UUID] | None:
+    if cursor is None:
+        return None
+
+    created_at, entity_id = decode_cursor(cursor, 2)
+    try:
+        return datetime.fromisoformat(created_at), uuid.UUID(entity_id)
+    except ValueError as e:
+        raise ClientRequestError(400, "invalid cursor") from e
+
+
+def _set_next_cursor(
+    response: Response, page: Sequence[tuple[datetime, uuid.UUID]], limit: int
+) -> None:
+    """`page` holds the (created_at, id) of the returned bids or reviews."""
+    if page and len(page) == limit:
+        created_at, entity_id = page[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            created_at.isoformat(), str(entity_id)
+        )
+
+
+@router.get("/api/bids/{tender_id}/list", response_model=list[BidModel])
+async def get_bids_for_tender(
+    access_repo: Annotated[AccessRepository, Depends(get_access_repository)],
     bid_repo: Annotated[BidRepository, Depends(get_bid_repository)],
-    org_repo: Annotated[OrganizationRepository, Depends(get_org_repository)],
+    response: Response,
     tender_id: str,
     username: str,
     limit: PaginationLimit = 5,
     offset: PaginationOffset = 0,
-) -> list[BidModel]:
-    employee = employee_repo.find_by_username(username)
-    assert401(employee is not None, "no employee found with such username")
-
-    try:
-        tender_uuid = uuid.UUID(tender_id)
-    except ValueError as e:
-        raise ClientRequestError(404, "invalid tender_id") from e
+    cursor: PaginationCursor = None,
+    if_none_match: IfNoneMatch = None,
+) -> Response:
+    after = _parse_cursor(cursor)
 
-    tender = tender_repo.find_by_id(tender_uuid)
-    assert404(tender is not None, "no such tender found")
-
-    have_access = tender_repo.has_write_access(
-        tender.id,
-        employee.id,
-        org_repo,
+    access = await access_repo.check_tender(
+        parse_uuid(tender_id), username, TenderPolicy.WRITE
     )
-    assert403(have_access)
+    tender = access.allowed_entity("no such tender found")
+
+    if if_none_match is not None:
+        keys = await bid_repo.get_published_paginated_keys(
+            tender.id, limit, offset, after
+        )
+        etag = entity_tag(keys)
+        if is_not_modified(if_none_match, etag):
+            return not_modified(etag)
 
-    return [
-        bid_version.as_model()
-        for bid_version in bid_repo.get_published_paginated(
+    if POSTGRES_RENDER_JSON:
+        rows = await bid_repo.get_published_paginated_json(
             tender.id,
             limit,
             offset,
+            after,
         )
-    ]
+        _set_next_cursor(response, [(row[1], row[2]) for row in rows], limit)
+        response.headers["ETag"] = entity_tag(row[3:] for row in rows)
+        return bid_list.render_objects([row[0] for row in rows], response)
+
+    bid_versions = await bid_repo.get_published_paginated(
+        tender.id,
+        limit,
+        offset,
+        after,
+    )
+    _set_next_cursor(
+        response, [(v.bid.created_at, v.bid.id) for v in bid_versions], limit
+    )
+
+    models = [bid_version.as_model() for bid_version in bid_versions]
+    response.headers["ETag"] = models_tag(models)
+    return bid_list.render(models, response)
 
 
-@router.get("/api/bids/my")
-def get_my_tenders(
+@router.get("/api/bids/{tender_id}/search", response_model=list[BidModel])
+async def search_bids_for_tender(
+    access_repo: Annotated[AccessRepository, Depends(get_access_repository)],
+    bid_repo: Annotated[BidRepository, Depends(get_bid_repository)],
+    response: Response,
+    tender_id: str,
+    username: str,
+    q: SearchText,
+    limit: PaginationLimit = 5,
+    offset: PaginationOffset = 0,
+    cursor: PaginationCursor = None,
+    if_none_match: IfNoneMatch = None,
+) -> Response:
+    after = decode_search_cursor(cursor)
+
+    access = await access_repo.check_tender(
+        parse_uuid(tender_id), username, TenderPolicy.WRITE
+    )
+    tender = access.allowed_entity("no such tender found")
+
+    rows = await bid_repo.search_published(tender.id, q, limit, offset, after)
+    if rows and len(rows) == limit:
+        last, rank = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_search_cursor(rank, last.id)
+
+    models = [bid_version.as_model() for bid_version, _ in rows]
+    etag = models_tag(models)
+    if is_not_modified(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return bid_list.render(models, response)
+
+
+@router.get("/api/bids/my", response_model=list[BidModel])
+async def get_my_tenders(
     bid_repo: Annotated[BidRepository, Depends(get_bid_repository)],
     employee_repo: Annotated[EmployeeRepository, Depends(get_employee_repository)],
+    response: Response,
     username: str | None = None,
     limit: PaginationLimit = 5,
     offset: PaginationOffset = 0,
-) -> list[BidModel]:
+    cursor: PaginationCursor = None,
+    if_none_match: IfNoneMatch = None,
+) -> Response:
+    after = _parse_cursor(cursor)
+
     if username is None:
-        return []
+        return bid_list.render([], response)
 
-    employee = employee_repo.find_by_username(username)
-    assert401(employee is not None, "no employee found with such username")
+    employee_id = await employee_repo.find_id_by_username(username)
+    assert401(employee_id is not None, "no employee found with such username")
+    assert employee_id is not None
 
-    return [
-        bid_version.as_model()
-        for bid_version in bid_repo.get_created_by_employee(
-            employee.id,
+    if if_none_match is not None:
+        keys = await bid_repo.get_created_by_employee_keys(
+            employee_id, limit, offset, after
+        )
+        etag = entity_tag(keys)
+        if is_not_modified(if_none_match, etag):
+            return not_modified(etag)
+
+    if POSTGRES_RENDER_JSON:
+        rows = await bid_repo.get_created_by_employee_json(
+            employee_id,
             limit,
             offset,
+            after,
         )
-    ]
+        _set_next_cursor(response, [(row[1], row[2]) for row in rows], limit)
+        response.headers["ETag"] = entity_tag(row[3:] for row in rows)
+        return bid_list.render_objects([row[0] for row in rows], response)
 
+    bid_versions = await bid_repo.get_created_by_employee(
+        employee_id,
+        limit,
+        offset,
+        after,
+    )
+    _set_next_cursor(
+        response, [(v.bid.created_at, v.bid.id) for v in bid_versions], limit
+    )
 
-@router.get("/api/bids/{bid_id}/status")
-def get_bid_status(
-    employee_repo: Annotated[EmployeeRepository, Depends(get_employee_repository)],
-    org_repo: Annotated[OrganizationRepository, Depends(get_org_repository)],
-    bid_repo: Annotated[BidRepository, Depends(get_bid_repository)],
-    bid_id: str,
-    username: str,
-) -> BidStatus:
-    employee = employee_repo.find_by_username(username)
-    assert401(employee is not None, "no employee found with such username")
-    employee_id = employee.id
+    models = [bid_version.as_model() for bid_version in bid_versions]
+    response.headers["ETag"] = models_tag(models)
+    return bid_list.render(models, response)
 
-    try:
-        bid_uuid = uuid.UUID(bid_id)
-    except ValueError as e:
-        raise ClientRequestError(404, "invalid bid_id") from e
 
-    bid = bid_repo.find_by_id(bid_uuid)
-    assert404(bid is not None, "no such bid found")
+@router.get("/api/bids/{tender_id}/reviews", response_model=list[BidReviewModel])
+async def get_bid_reviews(
+    access_repo: Annotated[AccessRepository, Depends(get_access_repository)],
+    bid_repo: Annotated[BidRepository, Depends(get_bid_repository)],
+    response: Response,
+    tender_id: str,
+    author_username: Annotated[str, Query(alias="authorUsername")],
+    requester_username: Annotated[str, Query(alias="requesterUsername")],
+    limit: PaginationLimit = 5,
+    offset: PaginationOffset = 0,
+    cursor: PaginationCursor = None,
+) -> Response:
+    after = _parse_cursor(cursor)
+
+    access = await access_repo.check_author_reviews(
+        parse_uuid(tender_id), requester_username, author_username
+    )
+    author_id = access.allowed_entity("no bids of the author found for the tender")
 
-    has_access = bid_repo.has_read_access(
-        bid.id,
-        employee_id,
-        org_repo,
+    reviews = await bid_repo.get_reviews_by_author(author_id, limit, offset, after)
+    _set_next_cursor(response, [(r.created_at, r.id) for r in reviews], limit)
+    return bid_review_list.render(
+        [BidReviewModel.model_validate(review) for review in reviews], response
     )
-    assert403(has_access)
 
+
+@router.get("/api/bids/{bid_id}/status", response_model=BidStatus)
+async def get_bid_status(
+    access_repo: Annotated[AccessRepository, Depends(get_access_repository)],
+    response: Response,
+    bid_id: str,
+    username: str,
+    if_none_match: IfNoneMatch = None,
+) -> BidStatus | Response:
+    access = await access_repo.check_bid(parse_uuid(bid_id), username, BidPolicy.READ)
+    bid = access.allowed_entity("no such bid found")
+
+    etag = entity_tag([(bid.id, bid.status)])
+    if is_not_modified(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return bid.status
@@ -0,0 +1,47 @@
+from typing import Any
+
+from fastapi import APIRouter
+
+from avito_sep24.cache import (
+    TTLCache,
+    employee_ids,
+    memberships,
+    responsibles,
+    tender_feed,
+)
+from avito_sep24.env import TENDER_FEED_CACHE
+from avito_sep24.schemas.cache import (
+    CachesStatsModel,
+    CacheStatsModel,
+    MembershipIndexStatsModel,
+    TenderFeedStatsModel,
+)
+
+router = APIRouter()
+
+
+def _stats(cache: TTLCache[Any, Any]) -> CacheStatsModel:
+    return CacheStatsModel(size=len(cache), hits=cache.hits, misses=cache.misses)
+
+
+@router.get("/api/cache/stats")
+async def get_cache_stats() -> CachesStatsModel:
+    return CachesStatsModel(
+        employees=_stats(employee_ids),
+        responsibles=_stats(responsibles),
+        membership_index=MembershipIndexStatsModel(
+            organizations=memberships.organizations,
+            memberships=memberships.memberships,
+            memory_bytes=memberships.memory_bytes(),
+        )
+        if memberships.loaded
+        else None,
+        tender_feed=TenderFeedStatsModel(
+            backend=TENDER_FEED_CACHE,
+            hits=tender_feed.hits,
+            misses=tender_feed.misses,
+            hit_rate=tender_feed.hits / max(tender_feed.hits + tender_feed.misses, 1),
+        )
+        if tender_feed is not None
+        else None,
+    )
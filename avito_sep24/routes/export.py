@@ -0,0 +1,76 @@
+from collections.abc import AsyncIterator
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+from avito_sep24.database import stream_partitions
+from avito_sep24.errors import assert401, assert403
+from avito_sep24.repositories.bid import BidRepository
+from avito_sep24.repositories.employee import (
+    EmployeeRepository,
+    get_employee_repository,
+)
+from avito_sep24.repositories.organization import (
+    OrganizationRepository,
+    get_org_repository,
+)
+from avito_sep24.repositories.tender import TenderRepository
+
+router = APIRouter()
+
+# rows fetched from the server-side cursor at once, and sent as one chunk
+EXPORT_BATCH_SIZE = 1000
+
+
+async def _responsible_employee(
+    employee_repo: EmployeeRepository,
+    org_repo: OrganizationRepository,
+    username: str,
+) -> UUID:
+    employee_id = await employee_repo.find_id_by_username(username)
+    assert401(employee_id is not None, "no employee found with such username")
+    assert employee_id is not None
+    assert403(
+        await org_repo.is_responsible_for_any(employee_id),
+        "you are not responsible for any organization",
+    )
+    return employee_id
+
+
+async def _ndjson(statement: Select[tuple[str]]) -> AsyncIterator[bytes]:
+    async for partition in stream_partitions(statement, EXPORT_BATCH_SIZE):
+        yield "".join(f"{line}\n" for (line,) in partition).encode()
+
+
+def _stream(statement: Select[tuple[str]]) -> StreamingResponse:
+    return StreamingResponse(_ndjson(statement), media_type="application/x-ndjson")
+
+
+@router.get("/api/export/tenders")
+async def export_tenders(
+    employee_repo: Annotated[EmployeeRepository, Depends(get_employee_repository)],
+    org_repo: Annotated[OrganizationRepository, Depends(get_org_repository)],
+    username: str,
+    history: bool = False,
+) -> StreamingResponse:
+    """
+    Tenders of the organizations the employee is responsible for, one JSON
+    object per line; every version of them if `history`.
+    """
+    employee_id = await _responsible_employee(employee_repo, org_repo, username)
+    return _stream(TenderRepository.select_export_json(employee_id, history))
+
+
+@router.get("/api/export/bids")
+async def export_bids(
+    employee_repo: Annotated[EmployeeRepository, Depends(get_employee_repository)],
+    org_repo: Annotated[OrganizationRepository, Depends(get_org_repository)],
+    username: str,
+    history: bool = False,
+) -> StreamingResponse:
+    """Bids on the tenders of the same organizations, see export_tenders."""
+    employee_id = await _responsible_employee(employee_repo, org_repo, username)
+    return _stream(BidRepository.select_export_json(employee_id, history))
@@ -5,5 +5,5 @@ router = APIRouter()
 
 
 @router.get("/api/ping")
-def ping() -> PlainTextResponse:
+async def ping() -> PlainTextResponse:
     return PlainTextResponse("ok")
@@ -0,0 +1,29 @@
+from anyio.to_thread import current_default_thread_limiter
+from fastapi import APIRouter
+
+from avito_sep24.database import get_pool
+from avito_sep24.env import POSTGRES_MAX_OVERFLOW
+from avito_sep24.schemas.pool import PoolStatsModel
+
+router = APIRouter()
+
+
+@router.get("/api/pool/stats")
+async def get_pool_stats() -> PoolStatsModel:
+    pool = get_pool()
+    stats = pool.checkout_stats
+    limiter = current_default_thread_limiter()
+
+    return PoolStatsModel(
+        size=pool.size(),
+        max_overflow=POSTGRES_MAX_OVERFLOW,
+        checked_out=pool.checkedout(),
+        checked_in=pool.checkedin(),
+        waiting=stats.waiting,
+        checkouts=stats.checkouts,
+        wait_time_total=stats.wait_time_total,
+        wait_time_avg=stats.wait_time_avg,
+        wait_time_max=stats.wait_time_max,
+        threads_limit=int(limiter.total_tokens),
+        threads_busy=limiter.borrowed_tokens,
+    )
@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+
+from . import changes, create, events, read, update
+
+__all__ = ["router"]
+
+router = APIRouter()
+router.include_router(changes.router)
+router.include_router(create.router)
+router.include_router(events.router)
+router.include_router(read.router)
+router.include_router(update.router)
@@ -0,0 +1,50 @@
+import hmac
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header, Response
+
+from avito_sep24.env import CHANGE_FEED_TOKEN
+from avito_sep24.errors import assert401, assert404
+from avito_sep24.repositories.change import ChangeRepository, get_change_repository
+from avito_sep24.responses import change_list
+from avito_sep24.schemas.change import (
+    ChangeModel,
+    ChangesLimit,
+    decode_change_cursor,
+    encode_change_cursor,
+)
+from avito_sep24.schemas.pagination import NEXT_CURSOR_HEADER, PaginationCursor
+
+router = APIRouter()
+
+
+@router.get("/api/tenders/changes", response_model=list[ChangeModel])
+async def get_changes(
+    change_repo: Annotated[ChangeRepository, Depends(get_change_repository)],
+    response: Response,
+    limit: ChangesLimit = 1000,
+    cursor: PaginationCursor = None,
+    authorization: Annotated[str | None, Header()] = None,
+) -> Response:
+    """
+    Tenders and bids changed since `cursor`, for services that keep a copy in
+    sync. Unlike the lists, the cursor of the next page is always sent, even
+    for an empty page, to be polled with later.
+    """
+    assert404(bool(CHANGE_FEED_TOKEN), "change feed is disabled")
+    assert401(
+        authorization is not None
+        and hmac.compare_digest(authorization, f"Bearer {CHANGE_FEED_TOKEN}")
+    )
+    after = decode_change_cursor(cursor)
+
+    rows = await change_repo.get_changes(limit, after)
+    if rows:
+        _, change_xid, change_seq = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_change_cursor(
+            change_xid, change_seq
+        )
+    elif cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+
+    return change_list.render_objects([row[0] for row in rows], response)
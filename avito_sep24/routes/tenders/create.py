@@ -1,9 +1,10 @@
 import uuid
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 
 from avito_sep24.errors import ClientRequestError, assert401, assert403
+from avito_sep24.etags import model_tag
 from avito_sep24.repositories.employee import (
     EmployeeRepository,
     get_employee_repository,
@@ -12,42 +13,119 @@ from avito_sep24.repositories.organization import (
     OrganizationRepository,
     get_org_repository,
 )
-from avito_sep24.repositories.tender import TenderRepository, get_tender_repository
+from avito_sep24.repositories.tender import (
+    NewTender,
+    TenderRepository,
+    get_tender_repository,
+)
 from avito_sep24.schemas.tender import (
+    TenderBulkCreateItems,
+    TenderBulkResultModel,
     TenderCreateModel,
     TenderModel,
 )
+from avito_sep24.utils import parse_uuid
 
 router = APIRouter()
 
 
 @router.post("/api/tenders/new")
-def create_new_tender(
+async def create_new_tender(
     model: TenderCreateModel,
     tender_repo: Annotated[TenderRepository, Depends(get_tender_repository)],
     employee_repo: Annotated[EmployeeRepository, Depends(get_employee_repository)],
     org_repo: Annotated[OrganizationRepository, Depends(get_org_repository)],
+    response: Response,
 ) -> TenderModel:
-    creator = employee_repo.find_by_username(model.creator_username)
-    assert401(creator is not None, "no employee found with such username")
+    creator_id = await employee_repo.find_id_by_username(model.creator_username)
+    assert401(creator_id is not None, "no employee found with such username")
 
     try:
         organization_id = uuid.UUID(model.organization_id)
-        organization = org_repo.find_by_id(organization_id)
+        organization = await org_repo.find_by_id(organization_id)
     except ValueError as e:
         raise ClientRequestError(401, "invalid organization id") from e
 
     assert401(organization is not None, "no such organization")
 
-    is_responsible = org_repo.is_responsible(organization.id, creator.id)
+    is_responsible = await org_repo.is_responsible(organization.id, creator_id)
     assert403(is_responsible, "you are not responsible for this organization")
 
-    tender_version = tender_repo.create_as_version(
+    tender = await tender_repo.create_as_version(
         name=model.name,
         description=model.description,
         service_type=model.service_type,
         organization_id=organization.id,
-        creator_id=creator.id,
+        creator_id=creator_id,
+    )
+
+    response.headers["ETag"] = model_tag(tender)
+    return tender
+
+
+@router.post("/api/tenders/bulk")
+async def create_new_tenders(
+    models: TenderBulkCreateItems,
+    tender_repo: Annotated[TenderRepository, Depends(get_tender_repository)],
+    employee_repo: Annotated[EmployeeRepository, Depends(get_employee_repository)],
+    org_repo: Annotated[OrganizationRepository, Depends(get_org_repository)],
+) -> list[TenderBulkResultModel]:
+    """
+    Creates every tender that /api/tenders/new would, in one transaction. The
+    checks are the same, but done with a query per kind rather than per item:
+    responsibility is checked once per (creator, organization).
+    """
+    creator_ids = await employee_repo.find_ids_by_usernames(
+        {model.creator_username for model in models}
+    )
+    organization_ids = [parse_uuid(model.organization_id) for model in models]
+    existing_organization_ids = await org_repo.find_existing_ids(
+        {organization_id for organization_id in organization_ids if organization_id}
     )
+    responsible = await org_repo.find_responsible(
+        {
+            (organization_id, creator_ids[model.creator_username])
+            for model, organization_id in zip(models, organization_ids, strict=True)
+            if organization_id in existing_organization_ids
+            and model.creator_username in creator_ids
+        }
+    )
+
+    results: list[TenderBulkResultModel | None] = []
+    new_tenders: list[NewTender] = []
+    for model, organization_id in zip(models, organization_ids, strict=True):
+        creator_id = creator_ids.get(model.creator_username)
+        try:
+            assert401(creator_id is not None, "no employee found with such username")
+            assert401(organization_id is not None, "invalid organization id")
+            assert401(
+                organization_id in existing_organization_ids, "no such organization"
+            )
+            assert403(
+                (organization_id, creator_id) in responsible,
+                "you are not responsible for this organization",
+            )
+        except ClientRequestError as e:
+            results.append(
+                TenderBulkResultModel(status_code=e.status_code, reason=e.reason)
+            )
+            continue
+
+        assert creator_id is not None and organization_id is not None
+        results.append(None)
+        new_tenders.append(
+            NewTender(
+                name=model.name,
+                description=model.description,
+                service_type=model.service_type,
+                organization_id=organization_id,
+                creator_id=creator_id,
+            )
+        )
 
-    return tender_version.as_model()
+    created = iter(await tender_repo.create_many_as_versions(new_tenders))
+    return [
+        result
+        or TenderBulkResultModel(status_code=200, tender=next(created).as_model())
+        for result in results
+    ]
@@ -0,0 +1,50 @@
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Annotated
+
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+
+from avito_sep24.env import TENDER_EVENTS
+from avito_sep24.errors import assert404
+from avito_sep24.events import KEEPALIVE_FRAME, LAGGED_FRAME, tender_events
+from avito_sep24.schemas.tender import TenderServiceType
+
+router = APIRouter()
+
+# seconds without events after which a keepalive comment is sent
+KEEPALIVE_INTERVAL = 15
+
+
+async def _stream(
+    service_types: list[TenderServiceType] | None,
+) -> AsyncIterator[bytes]:
+    # Starlette cancels the stream when the client disconnects,
+    # which unsubscribes it
+    with tender_events.subscribe(service_types) as subscriber:
+        while True:
+            try:
+                frame = await asyncio.wait_for(subscriber.get(), KEEPALIVE_INTERVAL)
+            except TimeoutError:
+                yield KEEPALIVE_FRAME
+                continue
+            yield frame
+            if frame is LAGGED_FRAME:
+                return
+
+
+@router.get("/api/tenders/events")
+async def get_tender_events(
+    service_type: Annotated[list[TenderServiceType] | None, Query()] = None,
+) -> StreamingResponse:
+    """
+    Server-sent events of published, edited and closed tenders, with the
+    tender as it is after the change; see events.TenderEventType.
+    """
+    assert404(TENDER_EVENTS, "tender events are disabled")
+
+    return StreamingResponse(
+        _stream(service_type),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
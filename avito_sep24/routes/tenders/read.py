@@ -1,95 +1,209 @@
 import uuid
+from collections.abc import Awaitable
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 
-from avito_sep24.errors import ClientRequestError, assert401, assert403, assert404
+from avito_sep24.cache import CachedPage, tender_feed
+from avito_sep24.env import POSTGRES_RENDER_JSON
+from avito_sep24.errors import ClientRequestError, assert401
+from avito_sep24.etags import (
+    IfNoneMatch,
+    entity_tag,
+    is_not_modified,
+    models_tag,
+    not_modified,
+)
+from avito_sep24.repositories.access import (
+    AccessRepository,
+    TenderPolicy,
+    get_access_repository,
+)
 from avito_sep24.repositories.employee import (
     EmployeeRepository,
     get_employee_repository,
 )
-from avito_sep24.repositories.organization import (
-    OrganizationRepository,
-    get_org_repository,
-)
 from avito_sep24.repositories.tender import TenderRepository, get_tender_repository
-from avito_sep24.schemas.pagination import PaginationLimit, PaginationOffset
+from avito_sep24.responses import tender_list
+from avito_sep24.schemas.pagination import (
+    NEXT_CURSOR_HEADER,
+    PaginationCursor,
+    PaginationLimit,
+    PaginationOffset,
+    decode_cursor,
+    encode_cursor,
+)
+from avito_sep24.schemas.search import (
+    SearchText,
+    decode_search_cursor,
+    encode_search_cursor,
+)
 from avito_sep24.schemas.tender import (
     TenderModel,
     TenderServiceType,
     TenderStatus,
 )
+from avito_sep24.utils import parse_uuid
 
 router = APIRouter()
 
 
-@router.get("/api/tenders")
-def get_tenders(
+async def _load_public_page(
+    tender_repo: TenderRepository,
+    limit: int,
+    offset: int,
+    service_type: list[TenderServiceType] | None,
+    after: tuple[str, uuid.UUID] | None,
+) -> CachedPage:
+    headers = {}
+    if POSTGRES_RENDER_JSON:
+        rows = await tender_repo.get_public_paginated_json(
+            limit, offset, service_type, after
+        )
+        if rows and len(rows) == limit:
+            _, name, version_id, *_ = rows[-1]
+            headers[NEXT_CURSOR_HEADER] = encode_cursor(name, str(version_id))
+        headers["ETag"] = entity_tag(row[3:] for row in rows)
+        return CachedPage(tender_list.dump_objects([row[0] for row in rows]), headers)
+
+    tender_versions = await tender_repo.get_public_paginated(
+        limit, offset, service_type, after
+    )
+    if tender_versions and len(tender_versions) == limit:
+        last = tender_versions[-1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(last.name, str(last.id))
+
+    models = [tender_version.as_model() for tender_version in tender_versions]
+    headers["ETag"] = models_tag(models)
+    return CachedPage(tender_list.dump(models), headers)
+
+
+@router.get("/api/tenders", response_model=list[TenderModel])
+async def get_tenders(
     tender_repo: Annotated[TenderRepository, Depends(get_tender_repository)],
+    response: Response,
     service_type: Annotated[list[TenderServiceType] | None, Query()] = None,
     limit: PaginationLimit = 5,
     offset: PaginationOffset = 0,
-) -> list[TenderModel]:
-    return [
-        tender_version.as_model()
-        for tender_version in tender_repo.get_public_paginated(
-            limit, offset, service_type
-        )
-    ]
+    cursor: PaginationCursor = None,
+    if_none_match: IfNoneMatch = None,
+) -> Response:
+    after = None
+    if cursor is not None:
+        name, version_id = decode_cursor(cursor, 2)
+        try:
+            after = (name, uuid.UUID(version_id))
+        except ValueError as e:
+            raise ClientRequestError(400, "invalid cursor") from e
+
+    def load() -> Awaitable[CachedPage]:
+        return _load_public_page(tender_repo, limit, offset, service_type, after)
+
+    if tender_feed is not None and after is None:
+        # pages past a cursor are too many to be worth caching
+        page = await tender_feed.get_or_load(service_type, (limit, offset), load)
+        if is_not_modified(if_none_match, page.headers["ETag"]):
+            return not_modified(page.headers["ETag"])
+    else:
+        if if_none_match is not None:
+            keys = await tender_repo.get_public_paginated_keys(
+                limit, offset, service_type, after
+            )
+            etag = entity_tag(keys)
+            if is_not_modified(if_none_match, etag):
+                return not_modified(etag)
+        page = await load()
 
+    response.headers.update(page.headers)
+    return tender_list.respond(page.body, response)
 
-@router.get("/api/tenders/my")
-def get_my_tenders(
+
+@router.get("/api/tenders/search", response_model=list[TenderModel])
+async def search_tenders(
+    tender_repo: Annotated[TenderRepository, Depends(get_tender_repository)],
+    response: Response,
+    q: SearchText,
+    service_type: Annotated[list[TenderServiceType] | None, Query()] = None,
+    limit: PaginationLimit = 5,
+    offset: PaginationOffset = 0,
+    cursor: PaginationCursor = None,
+    if_none_match: IfNoneMatch = None,
+) -> Response:
+    after = decode_search_cursor(cursor)
+
+    rows = await tender_repo.search_public(q, limit, offset, service_type, after)
+    if rows and len(rows) == limit:
+        last, rank = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_search_cursor(rank, last.id)
+
+    models = [tender_version.as_model() for tender_version, _ in rows]
+    etag = models_tag(models)
+    if is_not_modified(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return tender_list.render(models, response)
+
+
+@router.get("/api/tenders/my", response_model=list[TenderModel])
+async def get_my_tenders(
     tender_repo: Annotated[TenderRepository, Depends(get_tender_repository)],
     employee_repo: Annotated[EmployeeRepository, Depends(get_employee_repository)],
+    response: Response,
     username: str | None = None,
     limit: PaginationLimit = 5,
     offset: PaginationOffset = 0,
-) -> list[TenderModel]:
+    if_none_match: IfNoneMatch = None,
+) -> Response:
     if username is None:
-        return []
+        return tender_list.render([], response)
 
-    employee = employee_repo.find_by_username(username)
-    assert401(employee is not None, "no employee found with such username")
+    employee_id = await employee_repo.find_id_by_username(username)
+    assert401(employee_id is not None, "no employee found with such username")
+    assert employee_id is not None
 
-    return [
-        tender_version.as_model()
-        for tender_version in tender_repo.get_created_by_employee(
-            employee.id,
+    if if_none_match is not None:
+        keys = await tender_repo.get_created_by_employee_keys(
+            employee_id, limit, offset
+        )
+        etag = entity_tag(keys)
+        if is_not_modified(if_none_match, etag):
+            return not_modified(etag)
+
+    if POSTGRES_RENDER_JSON:
+        rows = await tender_repo.get_created_by_employee_json(
+            employee_id,
             limit,
             offset,
         )
-    ]
+        response.headers["ETag"] = entity_tag(row[1:] for row in rows)
+        return tender_list.render_objects([row[0] for row in rows], response)
 
+    tender_versions = await tender_repo.get_created_by_employee(
+        employee_id,
+        limit,
+        offset,
+    )
 
-@router.get("/api/tenders/{tender_id}/status")
-def get_tender_status(
-    tender_repo: Annotated[TenderRepository, Depends(get_tender_repository)],
-    employee_repo: Annotated[EmployeeRepository, Depends(get_employee_repository)],
-    org_repo: Annotated[OrganizationRepository, Depends(get_org_repository)],
-    tender_id: str,
-    username: str | None = None,
-) -> TenderStatus:
-    if username is not None:
-        employee = employee_repo.find_by_username(username)
-        assert401(employee is not None, "no employee found with such username")
-        employee_id = employee.id
-    else:
-        employee_id = uuid.uuid4()  # random UUID for anonymous user
-
-    try:
-        tender_uuid = uuid.UUID(tender_id)
-    except ValueError as e:
-        raise ClientRequestError(404, "invalid tender_id") from e
+    models = [tender_version.as_model() for tender_version in tender_versions]
+    response.headers["ETag"] = models_tag(models)
+    return tender_list.render(models, response)
 
-    tender = tender_repo.find_by_id(tender_uuid)
-    assert404(tender is not None, "no such tender found")
 
-    has_access = tender_repo.has_read_access(
-        tender.id,
-        employee_id,
-        org_repo,
+@router.get("/api/tenders/{tender_id}/status", response_model=TenderStatus)
+async def get_tender_status(
+    access_repo: Annotated[AccessRepository, Depends(get_access_repository)],
+    response: Response,
+    tender_id: str,
+    username: str | None = None,
+    if_none_match: IfNoneMatch = None,
+) -> TenderStatus | Response:
+    access = await access_repo.check_tender(
+        parse_uuid(tender_id), username, TenderPolicy.READ
     )
-    assert403(has_access)
+    tender = access.allowed_entity("no such tender found")
 
+    etag = entity_tag([(tender.id, tender.status)])
+    if is_not_modified(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return tender.status
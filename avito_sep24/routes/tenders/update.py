@@ -1,18 +1,14 @@
-import uuid
-from collections.abc import Iterator
+from collections.abc import AsyncIterator
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Path, Query
+from fastapi import APIRouter, Depends, Path, Query, Response
 
-from avito_sep24.errors import ClientRequestError, assert401, assert403, assert404
+from avito_sep24.etags import model_tag
 from avito_sep24.models import Tender
-from avito_sep24.repositories.employee import (
-    EmployeeRepository,
-    get_employee_repository,
-)
-from avito_sep24.repositories.organization import (
-    OrganizationRepository,
-    get_org_repository,
+from avito_sep24.repositories.access import (
+    AccessRepository,
+    TenderPolicy,
+    get_access_repository,
 )
 from avito_sep24.repositories.tender import TenderRepository, get_tender_repository
 from avito_sep24.schemas.tender import (
@@ -21,74 +17,58 @@ from avito_sep24.schemas.tender import (
     TenderUpdateModel,
     TenderVersionField,
 )
+from avito_sep24.utils import parse_uuid
 
 router = APIRouter()
 
 
-def validate_access(
-    tender_repo: Annotated[TenderRepository, Depends(get_tender_repository)],
-    employee_repo: Annotated[EmployeeRepository, Depends(get_employee_repository)],
-    org_repo: Annotated[OrganizationRepository, Depends(get_org_repository)],
+async def validate_access(
+    access_repo: Annotated[AccessRepository, Depends(get_access_repository)],
     tender_id: Annotated[str, Path()],
     username: Annotated[str, Query()],
-) -> Iterator[Tender]:
-    employee = employee_repo.find_by_username(username)
-    assert401(employee is not None, "no employee found with such username")
-
-    try:
-        tender_uuid = uuid.UUID(tender_id)
-    except ValueError as e:
-        raise ClientRequestError(404, "invalid tender_id") from e
-
-    tender = tender_repo.find_by_id(tender_uuid)
-    assert404(tender is not None, "no such tender found")
-
-    has_access = tender_repo.has_write_access(
-        tender.id,
-        employee.id,
-        org_repo,
+) -> AsyncIterator[Tender]:
+    access = await access_repo.check_tender(
+        parse_uuid(tender_id), username, TenderPolicy.WRITE
     )
-    assert403(has_access)
-
-    yield tender
+    yield access.allowed_entity("no such tender found")
 
 
 @router.put("/api/tenders/{tender_id}/status")
-def update_tender_status(
+async def update_tender_status(
     tender_repo: Annotated[TenderRepository, Depends(get_tender_repository)],
+    response: Response,
     tender: Annotated[Tender, Depends(validate_access)],
     status: TenderStatus,
 ) -> TenderModel:
-    tender_repo.update_status(tender.id, status)
+    model = await tender_repo.update_status(tender.id, status)
 
-    return tender_repo.get_last_version_by_id(tender.id).as_model()
+    response.headers["ETag"] = model_tag(model)
+    return model
 
 
 @router.patch("/api/tenders/{tender_id}/edit")
-def update_tender(
+async def update_tender(
     tender_repo: Annotated[TenderRepository, Depends(get_tender_repository)],
+    response: Response,
     tender: Annotated[Tender, Depends(validate_access)],
     update_model: TenderUpdateModel,
 ) -> TenderModel:
-    new_version = tender_repo.update(
+    model = await tender_repo.update(
         tender.id, **update_model.model_dump(exclude_none=True)
     )
 
-    return new_version.as_model()
+    response.headers["ETag"] = model_tag(model)
+    return model
 
 
 @router.put("/api/tenders/{tender_id}/rollback/{version}")
-def rollback_to_version(
+async def rollback_to_version(
     tender_repo: Annotated[TenderRepository, Depends(get_tender_repository)],
+    response: Response,
     tender: Annotated[Tender, Depends(validate_access)],
     version: TenderVersionField,
 ) -> TenderModel:
-    old_version = tender_repo.get_version_by_id(tender.id, version)
+    model = await tender_repo.rollback(tender.id, version)
 
-    return update_tender(
-        tender_repo,
-        tender,
-        TenderUpdateModel(
-            **{key: getattr(old_version, key) for key in TenderUpdateModel.model_fields}
-        ),
-    )
+    response.headers["ETag"] = model_tag(model)
+    return model
@@ -6,6 +6,7 @@ from typing import Annotated
 from pydantic import Field, StringConstraints
 
 from avito_sep24.schemas import BaseSchema
+from avito_sep24.schemas.tender import BULK_MAX_ITEMS
 
 __all__ = [
     "BidName",
@@ -18,6 +19,9 @@ __all__ = [
     "BidUpdateModel",
     "BidVersionField",
     "BidCreateModel",
+    "BidBulkCreateItems",
+    "BidBulkResultModel",
+    "BidReviewModel",
 ]
 
 BidName = Annotated[str, StringConstraints(max_length=100)]
@@ -65,3 +69,22 @@ class BidModel(_BidBaseModel):
     tender_id: uuid.UUID
     author_id: uuid.UUID
     version: BidVersionField
+
+
+class BidReviewModel(BaseSchema):
+    id: uuid.UUID
+    description: BidFeedback
+    created_at: datetime.datetime
+
+
+BidBulkCreateItems = Annotated[
+    list[BidCreateModel], Field(min_length=1, max_length=BULK_MAX_ITEMS)
+]
+
+
+class BidBulkResultModel(BaseSchema):
+    """See TenderBulkResultModel."""
+
+    status_code: int
+    reason: str | None = None
+    bid: BidModel | None = None
@@ -0,0 +1,36 @@
+from avito_sep24.schemas import BaseSchema
+
+__all__ = [
+    "CacheStatsModel",
+    "MembershipIndexStatsModel",
+    "TenderFeedStatsModel",
+    "CachesStatsModel",
+]
+
+
+class CacheStatsModel(BaseSchema):
+    size: int
+    hits: int
+    misses: int
+
+
+class MembershipIndexStatsModel(BaseSchema):
+    organizations: int
+    memberships: int
+    memory_bytes: int
+
+
+class TenderFeedStatsModel(BaseSchema):
+    backend: str
+    hits: int
+    misses: int
+    hit_rate: float
+
+
+class CachesStatsModel(BaseSchema):
+    employees: CacheStatsModel
+    responsibles: CacheStatsModel
+    # None unless MEMBERSHIP_INDEX is enabled and loaded
+    membership_index: MembershipIndexStatsModel | None
+    # None if TENDER_FEED_CACHE is off
+    tender_feed: TenderFeedStatsModel | None
@@ -0,0 +1,41 @@
+from typing import Annotated
+
+from pydantic import Field
+
+from avito_sep24.errors import ClientRequestError
+from avito_sep24.schemas import BaseSchema
+from avito_sep24.schemas.bid import BidModel
+from avito_sep24.schemas.pagination import decode_cursor, encode_cursor
+from avito_sep24.schemas.tender import TenderModel
+
+__all__ = [
+    "ChangeModel",
+    "ChangesLimit",
+    "encode_change_cursor",
+    "decode_change_cursor",
+]
+
+ChangesLimit = Annotated[int, Field(ge=1, le=10000)]
+
+
+class ChangeModel(BaseSchema):
+    """A tender or a bid as it is now, after a change; the other one is None."""
+
+    tender: TenderModel | None = None
+    bid: BidModel | None = None
+
+
+def encode_change_cursor(change_xid: int, change_seq: int) -> str:
+    return encode_cursor(str(change_xid), str(change_seq))
+
+
+def decode_change_cursor(cursor: str | None) -> tuple[int, int] | None:
+    """Changes are ordered by (change_xid, change_seq), see models.change."""
+    if cursor is None:
+        return None
+
+    change_xid, change_seq = decode_cursor(cursor, 2)
+    try:
+        return int(change_xid), int(change_seq)
+    except ValueError as e:
+        raise ClientRequestError(400, "invalid cursor") from e
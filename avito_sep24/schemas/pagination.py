@@ -1,6 +1,34 @@
+import base64
+import json
 from typing import Annotated
 
 from pydantic import Field
 
+from avito_sep24.errors import ClientRequestError
+
 PaginationLimit = Annotated[int, Field(ge=0, le=50)]
 PaginationOffset = Annotated[int, Field(ge=0)]
+PaginationCursor = Annotated[str | None, Field(max_length=1000)]
+
+# response header with the cursor of the next page, sent when the page is full
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: str) -> str:
+    """Packs the sort key of the last row on a page into an opaque string."""
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str, size: int) -> list[str]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor))
+    except ValueError as e:
+        raise ClientRequestError(400, "invalid cursor") from e
+
+    if (
+        not isinstance(values, list)
+        or len(values) != size
+        or not all(isinstance(value, str) for value in values)
+    ):
+        raise ClientRequestError(400, "invalid cursor")
+    return values
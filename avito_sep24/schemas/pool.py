@@ -0,0 +1,17 @@
+from avito_sep24.schemas import BaseSchema
+
+__all__ = ["PoolStatsModel"]
+
+
+class PoolStatsModel(BaseSchema):
+    size: int
+    max_overflow: int
+    checked_out: int
+    checked_in: int
+    waiting: int
+    checkouts: int
+    wait_time_total: float
+    wait_time_avg: float
+    wait_time_max: float
+    threads_limit: int
+    threads_busy: int
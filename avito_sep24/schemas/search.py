@@ -0,0 +1,31 @@
+import math
+import uuid
+from typing import Annotated
+
+from pydantic import StringConstraints
+
+from avito_sep24.errors import ClientRequestError
+from avito_sep24.schemas.pagination import decode_cursor, encode_cursor
+
+SearchText = Annotated[str, StringConstraints(min_length=1, max_length=200)]
+
+
+def encode_search_cursor(rank: float, version_id: uuid.UUID) -> str:
+    # the repository rounds it back to a real, the type of the rank, since
+    # drivers that read ranks as text do not return their exact value
+    return encode_cursor(repr(rank), str(version_id))
+
+
+def decode_search_cursor(cursor: str | None) -> tuple[float, uuid.UUID] | None:
+    """Search results are ordered by rank, highest first, then version id."""
+    if cursor is None:
+        return None
+
+    rank, version_id = decode_cursor(cursor, 2)
+    try:
+        after = float(rank), uuid.UUID(version_id)
+    except ValueError as e:
+        raise ClientRequestError(400, "invalid cursor") from e
+    if not math.isfinite(after[0]):
+        raise ClientRequestError(400, "invalid cursor")
+    return after
@@ -11,6 +11,8 @@ __all__ = [
     "TenderModel",
     "TenderCreateModel",
     "TenderUpdateModel",
+    "TenderBulkCreateItems",
+    "TenderBulkResultModel",
     "TenderName",
     "TenderDescription",
     "TenderVersionField",
@@ -22,6 +24,7 @@ __all__ = [
 TenderName = Annotated[str, StringConstraints(max_length=100)]
 TenderDescription = Annotated[str, StringConstraints(max_length=500)]
 TenderVersionField = Annotated[int, Field(ge=1)]
+BULK_MAX_ITEMS = 1000
 
 
 class TenderServiceType(enum.Enum):
@@ -59,3 +62,19 @@ class TenderModel(_TenderBaseModel):
     version: TenderVersionField
     created_at: datetime.datetime
     organization_id: uuid.UUID
+
+
+TenderBulkCreateItems = Annotated[
+    list[TenderCreateModel], Field(min_length=1, max_length=BULK_MAX_ITEMS)
+]
+
+
+class TenderBulkResultModel(BaseSchema):
+    """
+    Result of one item of a bulk creation: the status and reason the single
+    item endpoint would respond with, and the tender if it was created.
+    """
+
+    status_code: int
+    reason: str | None = None
+    tender: TenderModel | None = None
@@ -1,5 +1,13 @@
+import uuid
 from datetime import datetime
 
 
 def format_datetime(time: datetime) -> str:
     return time.replace(microsecond=0).isoformat() + "Z00:00"
+
+
+def parse_uuid(value: str) -> uuid.UUID | None:
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        return None
@@ -0,0 +1,95 @@
+"""
+Serialization cost of a 50-item page of tenders and of bids: the precompiled
+serializers of avito_sep24.responses against what FastAPI does for a
+`response_model` (see fastapi.routing.serialize_response: validate the
+models, dump them to Python objects, json.dumps). Needs no database:
+
+    make bench-serialization
+"""
+
+import datetime
+import timeit
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from fastapi.utils import create_model_field
+
+from avito_sep24.responses import JSONListRenderer, bid_list, tender_list
+from avito_sep24.schemas.bid import BidAuthorType, BidModel, BidStatus
+from avito_sep24.schemas.tender import TenderModel, TenderServiceType, TenderStatus
+
+PAGE_SIZE = 50
+ROUNDS = 2000
+
+CREATED_AT = datetime.datetime(2024, 9, 1, 12, 0)  # noqa: DTZ001 (naive in the DB)
+
+
+def tender_page() -> list[TenderModel]:
+    return [
+        TenderModel(
+            id=uuid.uuid4(),
+            name=f"Tender {i}",
+            description="Build a road from the warehouse to the highway",
+            service_type=TenderServiceType.CONSTRUCTION,
+            status=TenderStatus.PUBLISHED,
+            version=i % 5 + 1,
+            created_at=CREATED_AT + datetime.timedelta(seconds=i),
+            organization_id=uuid.uuid4(),
+        )
+        for i in range(PAGE_SIZE)
+    ]
+
+
+def bid_page() -> list[BidModel]:
+    return [
+        BidModel(
+            id=uuid.uuid4(),
+            name=f"Bid {i}",
+            description="We will build it in two weeks",
+            author_type=BidAuthorType.USER,
+            status=BidStatus.PUBLISHED,
+            tender_id=uuid.uuid4(),
+            author_id=uuid.uuid4(),
+            version=i % 5 + 1,
+            created_at=CREATED_AT + datetime.timedelta(seconds=i),
+        )
+        for i in range(PAGE_SIZE)
+    ]
+
+
+def fastapi_dump(response_model: object) -> Callable[[list[Any]], bytes]:
+    field = create_model_field("Response", response_model)
+
+    def dump(models: list[Any]) -> bytes:
+        value, errors = field.validate(models, {}, loc=("response",))
+        assert not errors
+        return bytes(JSONResponse(field.serialize(value, by_alias=True)).body)
+
+    return dump
+
+
+def measure(name: str, dump: Callable[[], bytes]) -> None:
+    seconds = min(timeit.repeat(dump, number=ROUNDS, repeat=5)) / ROUNDS
+    print(f"{name:<36} {seconds * 1_000_000:7.1f} µs per page")
+
+
+def compare(
+    renderer: JSONListRenderer[Any], response_model: object, page: list[Any]
+) -> None:
+    name = type(page[0]).__name__
+    fastapi = fastapi_dump(response_model)
+    assert renderer.dump(page) == fastapi(page), "the bytes must be identical"
+
+    measure(f"{name}, FastAPI response_model", lambda: fastapi(page))
+    measure(f"{name}, JSONListRenderer", lambda: renderer.dump(page))
+
+
+def main() -> None:
+    compare(tender_list, list[TenderModel], tender_page())
+    compare(bid_list, list[BidModel], bid_page())
+
+
+if __name__ == "__main__":
+    main()
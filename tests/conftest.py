@@ -0,0 +1,149 @@
+"""
+The tests run the app against the database in TEST_POSTGRES_CONN, which they
+wipe, and are skipped if it is not set:
+
+    TEST_POSTGRES_CONN=postgresql://... DATABASE_MODE=async pytest
+"""
+
+import asyncio
+import os
+import uuid
+from collections.abc import Awaitable, Callable, Iterator
+from typing import Any, TypeVar
+
+import pytest
+
+TEST_POSTGRES_CONN = os.environ.get("TEST_POSTGRES_CONN", "")
+
+# POSTGRES_CONN is read on import, so it is set before the app is imported; the
+# caches are off to make every request reach the database
+os.environ["POSTGRES_CONN"] = (
+    TEST_POSTGRES_CONN or "postgresql://nobody@127.0.0.1:1/none"
+)
+os.environ["IDENTITY_CACHE_TTL"] = "0"
+os.environ["TENDER_FEED_CACHE"] = "off"
+os.environ["TENDER_EVENTS"] = "false"
+os.environ["CHANGE_FEED_TOKEN"] = "test"
+
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+from sqlalchemy import event, text  # noqa: E402
+
+from avito_sep24 import bootstrap, create_app  # noqa: E402
+from avito_sep24.database import RawBase, get_async_engine, get_engine  # noqa: E402
+from avito_sep24.env import DATABASE_MODE  # noqa: E402
+from tests.helpers import Seed  # noqa: E402
+
+T = TypeVar("T")
+
+Scenario = Callable[[AsyncClient], Awaitable[T]]
+
+
+def pytest_collection_modifyitems(items: list[pytest.Item]) -> None:
+    if TEST_POSTGRES_CONN:
+        return
+    skip = pytest.mark.skip(reason="TEST_POSTGRES_CONN is not set")
+    for item in items:
+        item.add_marker(skip)
+
+
+class Queries:
+    """
+    Statements the app sends to the database inside a `with queries:` block,
+    with their parameters.
+    """
+
+    def __init__(self) -> None:
+        self.statements: list[tuple[str, Any]] = []
+        self._recording = False
+
+    def __enter__(self) -> "Queries":
+        self.statements.clear()
+        self._recording = True
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self._recording = False
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+    def record(
+        self,
+        _conn: object,
+        _cursor: object,
+        statement: str,
+        parameters: object,
+        *_: object,
+    ) -> None:
+        if self._recording:
+            self.statements.append((statement, parameters))
+
+
+@pytest.fixture(scope="session")
+def database() -> None:
+    bootstrap.main()
+
+
+@pytest.fixture
+def seed(database: None) -> Seed:
+    seed = Seed("alice", uuid.uuid4(), uuid.uuid4())
+    tables = ", ".join(table.name for table in RawBase.metadata.sorted_tables)
+    with get_engine().begin() as conn:
+        conn.execute(text(f"TRUNCATE {tables} CASCADE"))
+        conn.execute(
+            text("INSERT INTO employee (id, username) VALUES (:id, :username)"),
+            {"id": seed.employee_id, "username": seed.username},
+        )
+        conn.execute(
+            text(
+                "INSERT INTO organization (id, name, type) VALUES (:id, 'Acme', 'LLC')"
+            ),
+            {"id": seed.organization_id},
+        )
+        conn.execute(
+            text(
+                "INSERT INTO organization_responsible (id, organization_id, user_id) "
+                "VALUES (:id, :organization_id, :user_id)"
+            ),
+            {
+                "id": uuid.uuid4(),
+                "organization_id": seed.organization_id,
+                "user_id": seed.employee_id,
+            },
+        )
+    return seed
+
+
+@pytest.fixture
+def queries(database: None) -> Iterator[Queries]:
+    engine = (
+        get_async_engine().sync_engine if DATABASE_MODE == "async" else get_engine()
+    )
+    queries = Queries()
+    event.listen(engine, "before_cursor_execute", queries.record)
+    yield queries
+    event.remove(engine, "before_cursor_execute", queries.record)
+
+
+@pytest.fixture
+def run_app(database: None) -> Callable[[Scenario[T]], T]:
+    """Runs a scenario against a fresh app in its own event loop."""
+
+    def run(scenario: Scenario[T]) -> T:
+        async def main() -> T:
+            app = create_app()
+            transport = ASGITransport(app)
+            try:
+                async with (
+                    app.router.lifespan_context(app),
+                    AsyncClient(transport=transport, base_url="http://test") as client,
+                ):
+                    return await scenario(client)
+            finally:
+                # asyncpg connections belong to the loop that opened them
+                if DATABASE_MODE == "async":
+                    await get_async_engine().dispose()
+
+        return asyncio.run(main())
+
+    return run
@@ -0,0 +1,61 @@
+"""Requests that set up the data a test needs."""
+
+import uuid
+from dataclasses import dataclass
+from typing import Any
+
+from httpx import AsyncClient
+
+
+@dataclass(frozen=True)
+class Seed:
+    """An employee responsible for an organization."""
+
+    username: str
+    employee_id: uuid.UUID
+    organization_id: uuid.UUID
+
+
+async def create_tender(
+    client: AsyncClient, seed: Seed, *, publish: bool = True, **fields: object
+) -> dict[str, Any]:
+    response = await client.post(
+        "/api/tenders/new",
+        json={
+            "name": "Tender",
+            "description": "Description",
+            "serviceType": "Construction",
+            "organizationId": str(seed.organization_id),
+            "creatorUsername": seed.username,
+            **fields,
+        },
+    )
+    assert response.status_code == 200, response.text
+    tender: dict[str, Any] = response.json()
+    if publish:
+        response = await client.put(
+            f"/api/tenders/{tender['id']}/status",
+            params={"status": "Published", "username": seed.username},
+        )
+        assert response.status_code == 200, response.text
+        tender = response.json()
+    return tender
+
+
+async def create_bid(
+    client: AsyncClient, seed: Seed, tender_id: str, **fields: object
+) -> dict[str, Any]:
+    response = await client.post(
+        "/api/bids/new",
+        json={
+            "name": "Bid",
+            "description": "Description",
+            "tenderId": tender_id,
+            "authorType": "User",
+            "authorId": str(seed.employee_id),
+            **fields,
+        },
+    )
+    assert response.status_code == 200, response.text
+    bid: dict[str, Any] = response.json()
+    return bid
@@ -0,0 +1,44 @@
+import json
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from httpx import AsyncClient
+
+from avito_sep24.routes import export
+from tests.conftest import Scenario
+from tests.helpers import Seed, create_bid, create_tender
+
+TENDERS = 5
+
+
+def test_export_streams_every_row(
+    seed: Seed, run_app: Callable[[Scenario[Any]], Any], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # several batches, so the cursor is read more than once
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 2)
+
+    async def scenario(client: AsyncClient) -> dict[str, list[dict[str, Any]]]:
+        for i in range(TENDERS):
+            tender = await create_tender(client, seed, name=f"Tender {i}")
+            response = await client.patch(
+                f"/api/tenders/{tender['id']}/edit",
+                params={"username": seed.username},
+                json={"name": f"Tender {i}, edited"},
+            )
+            assert response.status_code == 200, response.text
+            await create_bid(client, seed, tender["id"])
+
+        lines = {}
+        for path in ("/api/export/tenders", "/api/export/bids"):
+            response = await client.get(
+                path, params={"username": seed.username, "history": True}
+            )
+            assert response.status_code == 200, response.text
+            lines[path] = [json.loads(line) for line in response.text.splitlines()]
+        return lines
+
+    lines = run_app(scenario)
+
+    assert len(lines["/api/export/tenders"]) == TENDERS * 2
+    assert len(lines["/api/export/bids"]) == TENDERS
@@ -0,0 +1,224 @@
+"""
+Plans of the statements the endpoints run, on a database large enough for
+Postgres to prefer an index over reading a whole table when one fits.
+
+The statements are recorded with their psycopg2 parameters, so this runs in
+sync mode only. The exports are left out: they read whole tables by design.
+"""
+
+from collections.abc import Callable, Iterator, Mapping
+from typing import Any
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+
+from avito_sep24.database import get_engine
+from avito_sep24.env import DATABASE_MODE
+from tests.conftest import Queries, Scenario
+from tests.helpers import Seed, create_bid, create_tender
+
+pytestmark = pytest.mark.skipif(
+    DATABASE_MODE != "sync", reason="the statements are explained with psycopg2"
+)
+
+EMPLOYEES = 2_000
+ORGANIZATIONS = 500
+TENDERS = 20_000
+BIDS = 40_000
+
+# read by nearly every request, so a sequential scan of any of them is a bug
+INDEXED_TABLES = {
+    "employee",
+    "organization_responsible",
+    "tender",
+    "tender_version",
+    "bid",
+    "bid_version",
+    "bid_review",
+    "bid_decision",
+}
+
+# ids are md5 hashes of the row number, so that they are spread like uuid4;
+# no name or description contains the words searched for
+DATASET = [
+    f"""
+    INSERT INTO employee (id, username)
+    SELECT md5('employee' || n)::uuid, 'user' || n
+    FROM generate_series(1, {EMPLOYEES}) AS n
+    """,
+    f"""
+    INSERT INTO organization (id, name, type)
+    SELECT md5('organization' || n)::uuid, 'Organization ' || n, 'LLC'
+    FROM generate_series(1, {ORGANIZATIONS}) AS n
+    """,
+    f"""
+    INSERT INTO organization_responsible (id, organization_id, user_id)
+    SELECT
+        md5('responsible' || n)::uuid,
+        md5('organization' || n % {ORGANIZATIONS} + 1)::uuid,
+        md5('employee' || n)::uuid
+    FROM generate_series(1, {EMPLOYEES}) AS n
+    """,
+    # two versions each, the second one is current
+    f"""
+    INSERT INTO tender (id, status, organization_id, creator_id, current_version_id)
+    SELECT
+        md5('tender' || n)::uuid,
+        (ARRAY['CREATED', 'PUBLISHED', 'CLOSED'])[n % 3 + 1]::tenderstatus,
+        md5('organization' || n % {ORGANIZATIONS} + 1)::uuid,
+        md5('employee' || n % {EMPLOYEES} + 1)::uuid,
+        md5('tender version' || n || '-2')::uuid
+    FROM generate_series(1, {TENDERS}) AS n
+    """,
+    f"""
+    INSERT INTO tender_version (id, tender_id, name, description, service_type, index)
+    SELECT
+        md5('tender version' || n || '-' || i)::uuid,
+        md5('tender' || n)::uuid,
+        'Tender ' || md5('name' || n),
+        'Description ' || n,
+        (ARRAY['CONSTRUCTION', 'DELIVERY', 'MANUFACTURE'])[n % 3 + 1]
+            ::tenderservicetype,
+        i
+    FROM generate_series(1, {TENDERS}) AS n, generate_series(1, 2) AS i
+    """,
+    f"""
+    INSERT INTO bid (id, status, tender_id, author_type, author_id, current_version_id)
+    SELECT
+        md5('bid' || n)::uuid,
+        (ARRAY['CREATED', 'PUBLISHED', 'CLOSED'])[n % 3 + 1]::bidstatus,
+        md5('tender' || n % {TENDERS} + 1)::uuid,
+        'USER',
+        md5('employee' || n % {EMPLOYEES} + 1)::uuid,
+        md5('bid version' || n)::uuid
+    FROM generate_series(1, {BIDS}) AS n
+    """,
+    f"""
+    INSERT INTO bid_version (id, bid_id, name, description, index)
+    SELECT
+        md5('bid version' || n)::uuid,
+        md5('bid' || n)::uuid,
+        'Bid ' || md5('name' || n),
+        'Description ' || n,
+        1
+    FROM generate_series(1, {BIDS}) AS n
+    """,
+    f"""
+    INSERT INTO bid_review (id, bid_id, author_id, description)
+    SELECT
+        md5('review' || n)::uuid,
+        md5('bid' || n)::uuid,
+        md5('employee' || n % {EMPLOYEES} + 1)::uuid,
+        'Fine'
+    FROM generate_series(1, {BIDS}) AS n
+    """,
+    f"""
+    INSERT INTO bid_decision (id, bid_id, author_id, decision)
+    SELECT
+        md5('decision' || n)::uuid,
+        md5('bid' || n)::uuid,
+        md5('employee' || n % {EMPLOYEES} + 1)::uuid,
+        'APPROVED'
+    FROM generate_series(1, {BIDS}) AS n
+    """,
+    "ANALYZE",
+]
+
+
+@pytest.fixture
+def large_dataset(seed: Seed) -> Seed:
+    with get_engine().begin() as conn:
+        for statement in DATASET[:-1]:
+            conn.execute(text(statement))
+    # ANALYZE can't see uncommitted rows
+    with get_engine().connect() as conn:
+        conn.execute(text(DATASET[-1]))
+        conn.commit()
+    return seed
+
+
+def sequential_scans(plan: dict[str, Any]) -> Iterator[str]:
+    if plan["Node Type"] == "Seq Scan" and plan["Relation Name"] in INDEXED_TABLES:
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from sequential_scans(child)
+
+
+def explain(statement: str, parameters: Mapping[str, Any]) -> dict[str, Any]:
+    conn = get_engine().raw_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+        row = cursor.fetchone()
+        assert row is not None
+        plan: dict[str, Any] = row[0][0]["Plan"]
+        return plan
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+async def call_endpoints(client: AsyncClient, seed: Seed) -> None:
+    """Calls every endpoint that reads or writes tenders and bids."""
+    username = {"username": seed.username}
+    tender = await create_tender(client, seed, name="Road")
+    tender_path = f"/api/tenders/{tender['id']}"
+    bid = await create_bid(client, seed, tender["id"], name="Road")
+    bid_path = f"/api/bids/{bid['id']}"
+
+    requests: list[tuple[str, str, dict[str, str], object]] = [
+        ("PATCH", f"{tender_path}/edit", username, {"name": "Road 2"}),
+        ("PUT", f"{tender_path}/rollback/1", username, None),
+        ("PATCH", f"{bid_path}/edit", username, {"name": "Road 2"}),
+        ("PUT", f"{bid_path}/rollback/1", username, None),
+        ("PUT", f"{bid_path}/status", {**username, "status": "Published"}, None),
+        ("PUT", f"{bid_path}/feedback", {**username, "bidFeedback": "Fine"}, None),
+        (
+            "PUT",
+            f"{bid_path}/submit_decision",
+            {**username, "decision": "Approved"},
+            None,
+        ),
+        ("GET", "/api/tenders", {"service_type": "Construction"}, None),
+        ("GET", "/api/tenders/search", {"q": "road"}, None),
+        ("GET", "/api/tenders/my", username, None),
+        ("GET", f"{tender_path}/status", username, None),
+        ("GET", f"/api/bids/{tender['id']}/list", username, None),
+        ("GET", f"/api/bids/{tender['id']}/search", {**username, "q": "road"}, None),
+        ("GET", "/api/bids/my", username, None),
+        (
+            "GET",
+            f"/api/bids/{tender['id']}/reviews",
+            {"authorUsername": seed.username, "requesterUsername": seed.username},
+            None,
+        ),
+        ("GET", f"{bid_path}/status", username, None),
+        ("GET", "/api/tenders/changes", {}, None),
+    ]
+    for method, path, params, body in requests:
+        response = await client.request(
+            method,
+            path,
+            params=params,
+            json=body,
+            headers={"Authorization": "Bearer test"},
+        )
+        assert response.status_code == 200, (path, response.text)
+
+
+def test_statements_use_indexes(
+    large_dataset: Seed, queries: Queries, run_app: Callable[[Scenario[Any]], Any]
+) -> None:
+    with queries:
+        run_app(lambda client: call_endpoints(client, large_dataset))
+    assert queries.statements
+
+    scans = {
+        statement: tables
+        for statement, parameters in queries.statements
+        if (tables := sorted(set(sequential_scans(explain(statement, parameters)))))
+    }
+    assert not scans, "\n\n".join(
+        f"{', '.join(tables)}:\n{statement}" for statement, tables in scans.items()
+    )
@@ -0,0 +1,140 @@
+"""
+Statements run by the read endpoints. The counts must not depend on the page
+size: a model that loads its parent lazily would add a query per item.
+"""
+
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from httpx import AsyncClient
+
+from avito_sep24.routes.bids import read as bid_routes
+from avito_sep24.routes.tenders import read as tender_routes
+from tests.conftest import Queries, Scenario
+from tests.helpers import Seed, create_bid, create_tender
+
+ITEMS = 10
+
+
+@pytest.fixture(params=[False, True], ids=["orm", "render_json"])
+def render_json(
+    request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Runs the list endpoints with and without POSTGRES_RENDER_JSON."""
+    monkeypatch.setattr(tender_routes, "POSTGRES_RENDER_JSON", request.param)
+    monkeypatch.setattr(bid_routes, "POSTGRES_RENDER_JSON", request.param)
+
+
+def count_queries(
+    seed: Seed,
+    queries: Queries,
+    run_app: Callable[[Scenario[Any]], Any],
+    path: str,
+    *,
+    params: dict[str, Any] | None = None,
+    headers: dict[str, str] | None = None,
+) -> dict[int, int]:
+    """
+    Statements of a request for a page of one item and a page of ITEMS items,
+    with ITEMS published tenders and ITEMS reviewed bids of the first one.
+    """
+
+    async def scenario(client: AsyncClient) -> dict[int, int]:
+        tenders = [
+            await create_tender(client, seed, name=f"Road {i}") for i in range(ITEMS)
+        ]
+        for i in range(ITEMS):
+            bid = await create_bid(client, seed, tenders[0]["id"], name=f"Road {i}")
+            response = await client.put(
+                f"/api/bids/{bid['id']}/status",
+                params={"status": "Published", "username": seed.username},
+            )
+            assert response.status_code == 200, response.text
+            response = await client.put(
+                f"/api/bids/{bid['id']}/feedback",
+                params={"bidFeedback": "Fine", "username": seed.username},
+            )
+            assert response.status_code == 200, response.text
+
+        counts = {}
+        for limit in (1, ITEMS):
+            with queries:
+                response = await client.get(
+                    path.format(tender_id=tenders[0]["id"], bid_id=bid["id"]),
+                    params={"limit": limit, **(params or {})},
+                    headers=headers,
+                )
+            assert response.status_code == 200, response.text
+            body = response.json()
+            if isinstance(body, list):
+                assert len(body) == limit
+            counts[limit] = len(queries)
+        return counts
+
+    counts: dict[int, int] = run_app(scenario)
+    return counts
+
+
+@pytest.mark.parametrize(
+    ("path", "params", "expected"),
+    [
+        ("/api/tenders", {}, 1),
+        ("/api/tenders/my", {"username": "alice"}, 2),
+        ("/api/bids/{tender_id}/list", {"username": "alice"}, 2),
+        ("/api/bids/my", {"username": "alice"}, 2),
+    ],
+)
+@pytest.mark.usefixtures("render_json")
+def test_lists(
+    seed: Seed,
+    queries: Queries,
+    run_app: Callable[[Scenario[Any]], Any],
+    path: str,
+    params: dict[str, Any],
+    expected: int,
+) -> None:
+    counts = count_queries(seed, queries, run_app, path, params=params)
+
+    assert counts == {1: expected, ITEMS: expected}
+
+
+@pytest.mark.parametrize(
+    ("path", "params", "expected"),
+    [
+        ("/api/tenders/search", {"q": "road"}, 1),
+        ("/api/bids/{tender_id}/search", {"q": "road", "username": "alice"}, 2),
+        (
+            "/api/bids/{tender_id}/reviews",
+            {"authorUsername": "alice", "requesterUsername": "alice"},
+            2,
+        ),
+        ("/api/tenders/{tender_id}/status", {"username": "alice"}, 1),
+        ("/api/bids/{bid_id}/status", {"username": "alice"}, 1),
+    ],
+)
+def test_other_reads(
+    seed: Seed,
+    queries: Queries,
+    run_app: Callable[[Scenario[Any]], Any],
+    path: str,
+    params: dict[str, Any],
+    expected: int,
+) -> None:
+    counts = count_queries(seed, queries, run_app, path, params=params)
+
+    assert counts == {1: expected, ITEMS: expected}
+
+
+def test_changes(
+    seed: Seed, queries: Queries, run_app: Callable[[Scenario[Any]], Any]
+) -> None:
+    counts = count_queries(
+        seed,
+        queries,
+        run_app,
+        "/api/tenders/changes",
+        headers={"Authorization": "Bearer test"},
+    )
+
+    assert counts == {1: 1, ITEMS: 1}
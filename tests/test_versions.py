@@ -0,0 +1,80 @@
+import asyncio
+from collections.abc import Callable
+from typing import Any
+
+from httpx import AsyncClient, Response
+from sqlalchemy import text
+
+from avito_sep24.database import get_engine
+from tests.conftest import Scenario
+from tests.helpers import Seed, create_bid, create_tender
+
+# far more than the connections of the default pool, so most edits wait for one
+EDITS = 300
+
+
+def version_indexes(entity: str, entity_id: str) -> list[int]:
+    with get_engine().connect() as conn:
+        return list(
+            conn.scalars(
+                text(
+                    f"SELECT index FROM {entity}_version "
+                    f"WHERE {entity}_id = :id ORDER BY index"
+                ),
+                {"id": entity_id},
+            )
+        )
+
+
+async def edit_concurrently(
+    client: AsyncClient, path: str, username: str
+) -> list[Response]:
+    """Edits, with a rollback to the first version after every tenth one."""
+    return await asyncio.gather(
+        *(
+            client.put(f"{path}/rollback/1", params={"username": username})
+            if i % 10 == 0
+            else client.patch(
+                f"{path}/edit",
+                params={"username": username},
+                json={"name": f"Edit {i}"},
+            )
+            for i in range(EDITS)
+        )
+    )
+
+
+def assert_contiguous(responses: list[Response], indexes: list[int]) -> None:
+    assert [response.status_code for response in responses] == [200] * EDITS
+    # every edit added exactly one version, none was lost or repeated
+    assert sorted(response.json()["version"] for response in responses) == list(
+        range(2, EDITS + 2)
+    )
+    assert indexes == list(range(1, EDITS + 2))
+
+
+def test_concurrent_tender_edits(
+    seed: Seed, run_app: Callable[[Scenario[Any]], Any]
+) -> None:
+    async def scenario(client: AsyncClient) -> tuple[str, list[Response]]:
+        tender = await create_tender(client, seed)
+        path = f"/api/tenders/{tender['id']}"
+        return tender["id"], await edit_concurrently(client, path, seed.username)
+
+    tender_id, responses = run_app(scenario)
+
+    assert_contiguous(responses, version_indexes("tender", tender_id))
+
+
+def test_concurrent_bid_edits(
+    seed: Seed, run_app: Callable[[Scenario[Any]], Any]
+) -> None:
+    async def scenario(client: AsyncClient) -> tuple[str, list[Response]]:
+        tender = await create_tender(client, seed)
+        bid = await create_bid(client, seed, tender["id"])
+        path = f"/api/bids/{bid['id']}"
+        return bid["id"], await edit_concurrently(client, path, seed.username)
+
+    bid_id, responses = run_app(scenario)
+
+    assert_contiguous(responses, version_indexes("bid", bid_id))
@@ -0,0 +1,138 @@
+"""
+Statements run by the write endpoints. A response is built from the rows the
+write returned, so it never reloads what was just written.
+"""
+
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from httpx import AsyncClient
+
+from tests.conftest import Queries, Scenario
+from tests.helpers import Seed, create_bid, create_tender
+
+BULK_ITEMS = 10
+
+
+@pytest.mark.parametrize(
+    ("method", "path", "params", "body", "expected"),
+    [
+        (
+            "POST",
+            "/api/tenders/new",
+            {},
+            {
+                "name": "Tender",
+                "description": "Description",
+                "serviceType": "Delivery",
+                "organizationId": "{organization_id}",
+                "creatorUsername": "alice",
+            },
+            4,
+        ),
+        ("PUT", "/api/tenders/{tender_id}/status", {"status": "Closed"}, None, 2),
+        ("PATCH", "/api/tenders/{tender_id}/edit", {}, {"name": "Edited"}, 3),
+        ("PUT", "/api/tenders/{tender_id}/rollback/1", {}, None, 3),
+        (
+            "POST",
+            "/api/bids/new",
+            {},
+            {
+                "name": "Bid",
+                "description": "Description",
+                "tenderId": "{tender_id}",
+                "authorType": "Organization",
+                "authorId": "{organization_id}",
+            },
+            3,
+        ),
+        ("PUT", "/api/bids/{bid_id}/status", {"status": "Closed"}, None, 2),
+        ("PATCH", "/api/bids/{bid_id}/edit", {}, {"name": "Edited"}, 3),
+        ("PUT", "/api/bids/{bid_id}/rollback/1", {}, None, 3),
+        ("PUT", "/api/bids/{bid_id}/feedback", {"bidFeedback": "Fine"}, None, 2),
+        (
+            "PUT",
+            "/api/bids/{bid_id}/submit_decision",
+            {"decision": "Approved"},
+            None,
+            5,
+        ),
+    ],
+)
+def test_writes(
+    seed: Seed,
+    queries: Queries,
+    run_app: Callable[[Scenario[Any]], Any],
+    method: str,
+    path: str,
+    params: dict[str, str],
+    body: dict[str, str] | None,
+    expected: int,
+) -> None:
+    async def scenario(client: AsyncClient) -> None:
+        tender = await create_tender(client, seed)
+        bid = await create_bid(client, seed, tender["id"])
+        response = await client.put(
+            f"/api/bids/{bid['id']}/status",
+            params={"status": "Published", "username": seed.username},
+        )
+        assert response.status_code == 200, response.text
+
+        ids = {
+            "organization_id": seed.organization_id,
+            "tender_id": tender["id"],
+            "bid_id": bid["id"],
+        }
+        with queries:
+            response = await client.request(
+                method,
+                path.format(**ids),
+                params={"username": seed.username, **params},
+                json=body and {key: value.format(**ids) for key, value in body.items()},
+            )
+        assert response.status_code == 200, response.text
+
+    run_app(scenario)
+
+    assert len(queries) == expected
+
+
+@pytest.mark.parametrize("kind", ["tenders", "bids"])
+def test_bulk(
+    seed: Seed,
+    queries: Queries,
+    run_app: Callable[[Scenario[Any]], Any],
+    kind: str,
+) -> None:
+    async def scenario(client: AsyncClient) -> dict[int, int]:
+        tender = await create_tender(client, seed)
+        item = {
+            "tenders": {
+                "name": "Tender",
+                "description": "Description",
+                "serviceType": "Delivery",
+                "organizationId": str(seed.organization_id),
+                "creatorUsername": seed.username,
+            },
+            "bids": {
+                "name": "Bid",
+                "description": "Description",
+                "tenderId": tender["id"],
+                "authorType": "User",
+                "authorId": str(seed.employee_id),
+            },
+        }[kind]
+
+        counts = {}
+        for items in (1, BULK_ITEMS):
+            with queries:
+                response = await client.post(f"/api/{kind}/bulk", json=[item] * items)
+            assert response.status_code == 200, response.text
+            assert [result["statusCode"] for result in response.json()] == [200] * items
+            counts[items] = len(queries)
+        return counts
+
+    counts = run_app(scenario)
+
+    assert counts == {1: 5, BULK_ITEMS: 5}